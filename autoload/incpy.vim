@@ -1,10 +1,11 @@
 """ Public interface and management
 
 " Check to see if a python site-user dotfile exists in the users home-directory.
+" If it does, then execute it as soon as the interpreter has been started.
 function! incpy#ImportDotfile()
     let l:dotfile = g:incpy#PythonStartup
     if filereadable(l:dotfile)
-        call incpy#interpreter#execute_file(l:dotfile)
+        call incpy#interpreter#execute_file(l:dotfile, v:true)
     endif
 endfunction
 
@@ -28,6 +28,8 @@ function! incpy#bindings#commands()
 
     command -nargs=1 PyHelp call incpy#interpreter#halp(<q-args>)
     command -range PyHelpSelection <line1>,<line2>call incpy#interpreter#halp_selected()
+
+    command PyCancel call incpy#interpreter#cancel()
 endfunction
 
 " Set up the plugin mappings for the available commands
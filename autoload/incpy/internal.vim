@@ -28,30 +28,84 @@ function! incpy#internal#workspace(package, command)
     execute printf("pythonx (lambda F, ns: (lambda s: F(s, ns, ns)))(%s, %s)(%s)", l:python_execute, l:python_workspace, strings)
 endfunction
 
+" Execute the a:method for the "cache" object from the a:package module using
+" the dispatcher that was created for the package by incpy#internal#setup. The
+" a:parameters and a:keywords are values that are passed to the method as-is
+" through a global variable, so the command being executed never changes. If
+" a:guarded is true, then the method is only called if the "cache" exists.
+let s:dispatchers = {}
+function! incpy#internal#dispatch(package, method, parameters, keywords={}, guarded=v:false)
+    if !has_key(s:dispatchers, a:package)
+        let s:dispatchers[a:package] = printf("pythonx __import__(%s).dispatch()", incpy#string#quote_single(a:package))
+    endif
+
+    let l:method = (type(a:method) == v:t_list)? a:method : [a:method]
+    let g:incpy#internal#payload = [l:method, a:parameters, a:keywords, a:guarded]
+    try
+        execute s:dispatchers[a:package]
+    finally
+        unlet! g:incpy#internal#payload
+    endtry
+endfunction
+
 " Execute the a:method for the "cache" object from the a:package module.
 function! incpy#internal#execute(package, method, parameters, keywords={})
-    let l:cache = [printf('__import__(%s)', incpy#string#quote_single(a:package)), 'cache']
-    let l:method = (type(a:method) == v:t_list)? a:method : [a:method]
-    let l:kwparameters = len(a:keywords)? [printf('**%s', incpy#python#render(a:keywords))] : []
-    call incpy#internal#workspace(a:package, printf('%s(%s)', join(l:cache + l:method, '.'), join(a:parameters + l:kwparameters, ', ')))
+    return incpy#internal#dispatch(a:package, a:method, a:parameters, a:keywords, v:false)
 endfunction
 
 " Execute the a:method for the "cache" object in the module a:package iff the
 " attribute for the specified method name actually exists.
 function! incpy#internal#execute_guarded(package, method, parameters, keywords={})
-    let l:cache = [printf('__import__(%s)', incpy#string#quote_single(a:package)), 'cache']
-    let l:method = (type(a:method) == v:t_list)? a:method : [a:method]
-    let l:kwparameters = len(a:keywords)? [printf('**%s', incpy#python#render(a:keywords))] : []
-    call incpy#internal#workspace(a:package, printf("hasattr(%s, %s) and %s(%s)", join(l:cache[0 : -2], '.'), incpy#string#quote_single(l:cache[-1]), join(l:cache + l:method, '.'), join(a:parameters + l:kwparameters, ', ')))
+    return incpy#internal#dispatch(a:package, a:method, a:parameters, a:keywords, v:true)
+endfunction
+
+" Discard the buffer lookups that have been cached by the interface module
+" from a:package. This is called by an autocommand whenever a buffer has been
+" added, deleted, wiped out, or renamed so that the cache is never stale.
+function! incpy#internal#invalidate_buffers(package)
+    let l:interface_module = join([a:package, 'interface'], '.')
+    execute printf("pythonx __import__(%s).interface.vim.buffer.invalidate()", incpy#string#quote_single(l:interface_module))
+endfunction
+
+" Encode a:value as json so that the interface module can decode it with its
+" types preserved. If it contains something that can't be encoded (E474 or
+" E1161) like a funcref, job, or channel, then those are converted to strings.
+" This way the expression for a:value only needs to be evaluated once.
+function! incpy#internal#encode(value)
+    try
+        return json_encode(a:value)
+    catch /^Vim\%((\a\+)\)\=:E\%(474\|1161\):/
+    endtry
+    return json_encode(s:encodable(a:value))
+endfunction
+
+" Return a copy of a:value with every funcref (2), job (8), or channel (9) in
+" it replaced by its string. Numbers are used since neovim lacks the latter.
+function! s:encodable(value)
+    let l:type = type(a:value)
+    if l:type == type([]) || l:type == type({})
+        return map(copy(a:value), {_, item -> s:encodable(item)})
+    elseif index([2, 8, 9], l:type) >= 0
+        return string(a:value)
+    endif
+    return a:value
 endfunction
 
 " Send the specified a:code to the interpreter that is stored within the
-" module specified by a:package.
+" module specified by a:package after formatting it with a:format. Neither
+" of them are escaped. Instead they are stored in a global variable that is
+" read by the interpreter using `vim.eval`, and then removed afterwards.
 function! incpy#internal#communicate(package, format, code)
     let l:cache = [printf('__import__(%s)', incpy#string#quote_single(a:package)), 'cache']
-    let l:encoded = substitute(a:code, '.', '\=printf("\\x%02x", char2nr(submatch(0)))', 'g')
-    let l:lambda = printf("(lambda interpreter: (lambda code: interpreter.communicate(code)))(%s)", join(cache, '.'))
-    execute printf("pythonx %s(\"%s\".format(\"%s\"))", l:lambda, a:format, l:encoded)
+    let l:lambda = printf("(lambda interpreter: (lambda format, code: interpreter.communicate(format.format(code))))(%s)", join(cache, '.'))
+    let l:payload = printf("__import__(%s).eval(%s)", incpy#string#quote_single('vim'), incpy#string#quote_single('g:incpy#internal#payload'))
+
+    let g:incpy#internal#payload = [a:format, a:code]
+    try
+        execute printf("pythonx %s(*%s)", l:lambda, l:payload)
+    finally
+        unlet! g:incpy#internal#payload
+    endtry
 endfunction
 
 """ Utilities for setting up the plugin with dynamically generated python code.
@@ -64,7 +118,7 @@ function! incpy#internal#load(package, path)
 
     " Generate a closure that we will use to update the meta_path.
     let unnamed_definition =<< trim EOF
-    def %s(package_name, package_path, plugin_name):
+    def %s(package_name, package_path, plugin_name, cache_path):
         import builtins, os, sys, six
 
         # Create a namespace that we will execute our loader.py
@@ -104,7 +158,11 @@ function! incpy#internal#load(package, path)
         files = [filename for filename in os.listdir(package_path) if filename.endswith('.py')]
         iterable = ((os.path.splitext(filename), os.path.join(package_path, filename)) for filename in files)
         submodules = {name : path for (name, ext), path in iterable}
-        pythonx_finder = loader.vim_plugin_support_finder(package_path, submodules)
+
+        # If we were given a directory for caching bytecode, then use it
+        # so that our modules do not need to be compiled every startup.
+        cache = loader.bytecode_cache(cache_path) if cache_path and sys.version_info.major >= 3 else None
+        pythonx_finder = loader.vim_plugin_support_finder(package_path, submodules, cache)
 
         # Then we do another to expose a temporary workspace
         # that we can use to load code and other things into.
@@ -120,7 +178,7 @@ function! incpy#internal#load(package, path)
 
     " Next we need to use it with our parameters so that we can
     " create a hidden module to capture any python-specific work.
-    let quoted_parameters = map([l:package_name, l:package_path, g:incpy#PluginName], 'incpy#string#quote_double(v:val)')
+    let quoted_parameters = map([l:package_name, l:package_path, g:incpy#PluginName, g:incpy#BytecodeCache], 'incpy#string#quote_double(v:val)')
     execute printf("pythonx __import__(%s).meta_path.extend(%s(%s))", incpy#string#quote_single('sys'), l:loader_closure_name, join(quoted_parameters, ', '))
 
     " Now that it's been used, we're free to delete it.
@@ -136,29 +194,36 @@ function! incpy#internal#setup(package)
         package = __import__(package_name)
         interface, interpreters = (getattr(__import__('.'.join([package.__name__, module])), module) for module in ['interface', 'interpreters'])
 
-        # grab the program specified by the user
-        program = interface.vim.gvars["incpy#Program"]
-        use_terminal = any(interface.vim.has(feature) for feature in ['terminal', 'nvim']) and interface.vim.gvars["incpy#Terminal"]
-
-        # figure out which interpreter to use and then instantiate it.
-        try:
-            if len(program) > 0 and use_terminal:
-                interpreter = interpreters.neoterminal if interface.vim.has('nvim') else interpreters.terminal
-            elif len(program) > 0:
-                interpreter = interpreters.external
-            else:
-                interpreter = interpreters.internal
-            cache = interpreter(*[program] if program else [])
-
-        # if we couldn't start the interpreter, then fall back to an internal one
-        except Exception:
-            hasattr(package, 'logger') and package.logger.fatal("error starting external interpreter: {:s}".format(program), exc_info=True)
-            hasattr(package, 'logger') and package.logger.warning("falling back to internal python interpreter")
-            cache = interpreters.internal()
-
-        # assign the interpreter object into our package
-        cache.start(interface.vim.gvars["incpy#WindowName"])
-        package.cache = cache
+        # create the dispatcher that is used to call the methods of the interpreter
+        package.dispatch = interpreters.dispatcher(package, 'g:incpy#internal#payload')
+
+        # figure out which interpreter to use and then instantiate and start it.
+        def create(package=package, interface=interface, interpreters=interpreters):
+            program = interface.vim.gvars["incpy#Program"]
+            use_terminal = any(interface.vim.has(feature) for feature in ['terminal', 'nvim']) and interface.vim.gvars["incpy#Terminal"]
+
+            try:
+                options = {}
+                if len(program) > 0 and use_terminal:
+                    interpreter = interpreters.neoterminal if interface.vim.has('nvim') else interpreters.terminal
+                elif len(program) > 0:
+                    interpreter, options = interpreters.external, {'options': dict(interface.vim.gvars["incpy#ProgramOptions"] or {})}
+                else:
+                    interpreter = interpreters.internal
+                cache = interpreter(*[program] if program else [], **options)
+
+            # if we couldn't start the interpreter, then fall back to an internal one
+            except Exception:
+                hasattr(package, 'logger') and package.logger.fatal("error starting external interpreter: {:s}".format(program), exc_info=True)
+                hasattr(package, 'logger') and package.logger.warning("falling back to internal python interpreter")
+                cache = interpreters.internal()
+
+            cache.start(interface.vim.gvars["incpy#WindowName"])
+            return cache
+
+        # assign the interpreter into our package, but defer creating it until
+        # it is used so that we don't start anything if it is never needed.
+        package.cache = interpreters.deferred(create)
     EOC
 
     let code = printf(join(install_interpreter, "\n"), incpy#string#quote_single(a:package))
@@ -179,8 +244,8 @@ function! incpy#internal#setup_view(package)
         # grab the cached interpreter out of the package
         cache = package.cache
 
-        # now we just need to store its buffer id
-        interface.vim.gvars['incpy#BufferId'] = cache.view.buffer.number
+        # now we just need to store its buffer id once it has been started
+        cache.ready(lambda interpreter: interface.vim.gvars.__setitem__('incpy#BufferId', interpreter.view.buffer.number))
     EOC
 
     let code = printf(join(create_view, "\n"), incpy#string#quote_single(a:package))
@@ -19,7 +19,7 @@ endfunction
 
 " Show the currently running interpreter.
 function! incpy#interpreter#show()
-    let parameters = map(['incpy#WindowPosition', 'incpy#WindowRatio'], 'incpy#python#global_variable(v:val)')
+    let parameters = [g:incpy#WindowPosition, g:incpy#WindowRatio]
     call incpy#internal#execute_guarded(g:incpy#PackageName, ['show'], parameters, incpy#options#window())
 endfunction
 
@@ -28,6 +28,37 @@ function! incpy#interpreter#hide()
     call incpy#internal#execute_guarded(g:incpy#PackageName, ['hide'], [])
 endfunction
 
+" Update the window that the current interpreter knows is showing its output
+" for the autocommand named by a:event. This lets showing the interpreter avoid
+" querying the window layout when its window is already visible.
+function! incpy#interpreter#track(event)
+    let l:window = (a:event ==# 'WinClosed')? str2nr(expand('<amatch>')) : win_getid()
+    let l:buffer = (a:event ==# 'WinClosed')? str2nr(expand('<abuf>')) : bufnr()
+    call incpy#internal#execute_guarded(g:incpy#PackageName, ['track'], [a:event, l:window, l:buffer])
+endfunction
+
+" Write any output that has been staged by the current interpreter to its
+" buffer. This is called by a timer so that the buffer is only modified by
+" the main thread, and at most as often as specified by g:incpy#OutputRate.
+function! incpy#interpreter#pump(timer)
+    let l:because_neovim = printf('(__builtins__ if isinstance(__builtins__, {}.__class__) else __builtins__.__dict__)[%s]', incpy#string#quote_single('__import__'))
+    let l:cache = printf('getattr(%s(%s), %s, None)', l:because_neovim, incpy#string#quote_single(g:incpy#PackageName), incpy#string#quote_single('cache'))
+    let l:written = pyxeval(printf('getattr(%s, %s, lambda: 0)()', l:cache, incpy#string#quote_single('pump')))
+
+    " If anything was written and we're following the output, then tail it.
+    if l:written && g:incpy#OutputFollow
+        try | call incpy#ui#window#tail(g:incpy#BufferId) | catch /^Invalid/ | endtry
+    endif
+endfunction
+
+" Interrupt the code that is being executed by the worker thread of the
+" current interpreter. Interpreters without a worker thread will ignore this.
+function! incpy#interpreter#cancel()
+    let l:because_neovim = printf('(__builtins__ if isinstance(__builtins__, {}.__class__) else __builtins__.__dict__)[%s]', incpy#string#quote_single('__import__'))
+    let l:cache = printf('getattr(%s(%s), %s, None)', l:because_neovim, incpy#string#quote_single(g:incpy#PackageName), incpy#string#quote_single('cache'))
+    return pyxeval(printf('getattr(%s, %s, lambda: False)()', l:cache, incpy#string#quote_single('cancel')))
+endfunction
+
 """ Plugin interface for interacting with the interpreter.
 
 " Execute the lines in the specified range within the current intterpreter.
@@ -49,11 +80,11 @@ function! incpy#interpreter#range(begin, end)
 
     " Show the window and then send each line to the interpreter. If any of the
     " lines are empty, then avoid sending that specific line.
-    call incpy#internal#execute_guarded(g:incpy#PackageName, ['show'], map(['incpy#WindowPosition', 'incpy#WindowRatio'], 'incpy#python#global_variable(v:val)'), incpy#options#window())
+    call incpy#internal#execute_guarded(g:incpy#PackageName, ['show'], [g:incpy#WindowPosition, g:incpy#WindowRatio], incpy#options#window())
     let l:commands_stripped = (type(code_stripped) == v:t_list)? code_stripped : [code_stripped]
     for command_stripped in l:commands_stripped
         if len(command_stripped) > 0
-            call incpy#internal#communicate(g:incpy#PackageName, incpy#string#singleline(g:incpy#ExecFormat, "\"\\"), command_stripped)
+            call incpy#internal#communicate(g:incpy#PackageName, g:incpy#ExecFormat, command_stripped)
         endif
     endfor
 
@@ -78,11 +109,11 @@ function! incpy#interpreter#execute(line)
 
     " Show the window and send each line from our input to the interpreter. If
     " the stripped code results in an empty string, then skip over the sending.
-    call incpy#internal#execute_guarded(g:incpy#PackageName, ['show'], map(['incpy#WindowPosition', 'incpy#WindowRatio'], 'incpy#python#global_variable(v:val)'), incpy#options#window())
+    call incpy#internal#execute_guarded(g:incpy#PackageName, ['show'], [g:incpy#WindowPosition, g:incpy#WindowRatio], incpy#options#window())
     let l:commands_stripped = (type(code_stripped) == v:t_list)? code_stripped : [code_stripped]
     for command_stripped in l:commands_stripped
         if len(command_stripped) > 0
-            call incpy#internal#communicate(g:incpy#PackageName, incpy#string#singleline(g:incpy#ExecFormat, "\"\\"), command_stripped)
+            call incpy#internal#communicate(g:incpy#PackageName, g:incpy#ExecFormat, command_stripped)
         endif
     endfor
 
@@ -95,7 +126,7 @@ endfunction
 " Execute a line of code within the current interpreter without any encoding,
 " stripping, or formatting.
 function! incpy#interpreter#execute_raw(line)
-    call incpy#internal#execute_guarded(g:incpy#PackageName, ['show'], map(['incpy#WindowPosition', 'incpy#WindowRatio'], 'incpy#python#global_variable(v:val)'), incpy#options#window())
+    call incpy#internal#execute_guarded(g:incpy#PackageName, ['show'], [g:incpy#WindowPosition, g:incpy#WindowRatio], incpy#options#window())
     call incpy#internal#communicate(g:incpy#PackageName, "{}", a:line)
     if g:incpy#OutputFollow
         try | call incpy#ui#window#tail(g:incpy#BufferId) | catch /^Invalid/ | endtry
@@ -107,10 +138,13 @@ function! incpy#interpreter#evaluate(expr)
     let stripped = incpy#string#strip(g:incpy#EvalStrip, a:expr)
 
     " Evaluate an expression in the target using the plugin. If the stripped
-    " expression is an empty string (or list), then there's nothing to do.
-    call incpy#internal#execute_guarded(g:incpy#PackageName, ['show'], map(['incpy#WindowPosition', 'incpy#WindowRatio'], 'incpy#python#global_variable(v:val)'), incpy#options#window())
+    " expression is an empty string (or list), then there's nothing to do. The
+    " interpreter that is running decides whether to use the format, since the
+    " internal one compiles the last expression in "single" mode when asked to
+    " and then displays the result itself without needing any formatting.
+    call incpy#internal#execute_guarded(g:incpy#PackageName, ['show'], [g:incpy#WindowPosition, g:incpy#WindowRatio], incpy#options#window())
     if len(stripped) > 0
-        call incpy#internal#communicate(g:incpy#PackageName, incpy#string#singleline(g:incpy#EvalFormat, "\"\\"), stripped)
+        call incpy#internal#execute(g:incpy#PackageName, 'evaluate', [g:incpy#EvalFormat, stripped], {'single': g:incpy#EvalSingle? v:true : v:false})
     endif
 
     if g:incpy#OutputFollow
@@ -124,15 +158,19 @@ function! incpy#interpreter#halp(expr)
 
     " Execute g:incpy#HelpFormat in the target using the plugin's cached communicator
     if len(LetMeSeeYouStripped) > 0
-        call incpy#internal#execute_guarded(g:incpy#PackageName, ['show'], map(['incpy#WindowPosition', 'incpy#WindowRatio'], 'incpy#python#global_variable(v:val)'), incpy#options#window())
-        call incpy#internal#communicate(g:incpy#PackageName, incpy#string#singleline(g:incpy#HelpFormat, "\"\\"), incpy#string#escape_double(LetMeSeeYouStripped))
+        call incpy#internal#execute_guarded(g:incpy#PackageName, ['show'], [g:incpy#WindowPosition, g:incpy#WindowRatio], incpy#options#window())
+        call incpy#internal#communicate(g:incpy#PackageName, g:incpy#HelpFormat, incpy#string#escape_double(LetMeSeeYouStripped))
     endif
 endfunction
 
 " Execute the contents of the specified file within the current interpreter.
-function! incpy#interpreter#execute_file(filename)
+function! incpy#interpreter#execute_file(filename, deferred=v:false)
     let open_and_execute = printf("with open(%s) as infile: exec(infile.read())", incpy#string#quote_double(a:filename))
-    call incpy#internal#execute(g:incpy#PackageName, 'communicate', [incpy#string#quote_single(open_and_execute), 'silent=True'])
+    if a:deferred
+        call incpy#internal#execute(g:incpy#PackageName, 'defer', ['communicate', open_and_execute], {'silent': v:true})
+    else
+        call incpy#internal#execute(g:incpy#PackageName, 'communicate', [open_and_execute], {'silent': v:true})
+    endif
 endfunction
 
 """ Wrappers that depend on the functions above.
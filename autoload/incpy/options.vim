@@ -35,14 +35,20 @@ function! incpy#options#setup()
 
     " Set any default options for the plugin that the user missed
     let defopts["Program"] = ""
+    let defopts["ProgramOptions"] = {}
     let defopts["Echo"] = v:true
     let defopts["OutputFollow"] = v:true
+    let defopts["OutputRate"] = 30
+    let defopts["ScrollbackLines"] = 0
+    let defopts["ScrollbackBytes"] = 0
     let defopts["WindowName"] = s:WINDOW_NAME
     let defopts["WindowRatio"] = 1.0/3
     let defopts["WindowPosition"] = "below"
     let defopts["WindowOptions"] = {}
     let defopts["WindowPreview"] = v:false
     let defopts["WindowStartup"] = v:true
+    let defopts["InternalThread"] = v:false
+    let defopts["InternalTimeout"] = 0
 
     let defopts["Greenlets"] = v:false
     let defopts["Terminal"] = has('terminal') || has('nvim')
@@ -58,6 +64,7 @@ function! incpy#options#setup()
     let defopts["EchoNewline"] = "{}\n"
     let defopts["EvalFormat"] = printf("%s.displayhook(({}))\n", python_sys)
     let defopts["EvalStrip"] = v:false
+    let defopts["EvalSingle"] = v:false
     let defopts["ExecFormat"] = "{}\n"
     let defopts["ExecStrip"] = v:false
 
@@ -73,6 +80,20 @@ function! incpy#options#setup()
         let defopts["PythonStartup"] = v:null
     endif
 
+    " Use the cache directory for the user to store the compiled bytecode for
+    " the plugin. If we couldn't find one, then an empty string disables it.
+    if has('nvim')
+        let defopts["BytecodeCache"] = join([stdpath('cache'), s:PLUGIN_NAME], '/')
+    elseif exists("$XDG_CACHE_HOME")
+        let defopts["BytecodeCache"] = join(split($XDG_CACHE_HOME, '/', v:true) + [s:PLUGIN_NAME], '/')
+    elseif exists("$LOCALAPPDATA")
+        let defopts["BytecodeCache"] = join(split($LOCALAPPDATA, '\', v:true) + [s:PLUGIN_NAME], '/')
+    elseif exists("$HOME")
+        let defopts["BytecodeCache"] = join(split($HOME, '/', v:true) + ['.cache', s:PLUGIN_NAME], '/')
+    else
+        let defopts["BytecodeCache"] = ""
+    endif
+
     " Set the default window options that the user will override.
     let defopts["CoreWindowOptions"] = has('nvim')? s:neo_window_options : s:core_window_options
 
@@ -12,6 +12,11 @@ function! incpy#ui#window#select(id)
     return current
 endfunction
 
+" Move the cursor of every window showing the buffer a:bufid to its last line
+" without changing the current window or tab. Each window is only moved once
+" for every change to the buffer, so multiple calls for the same output will
+" be coalesced into a single move.
+let s:followed = {}
 function! incpy#ui#window#tail(bufid)
 
     " if we were given a bunk buffer id, then we need to bitch
@@ -20,6 +25,32 @@ function! incpy#ui#window#tail(bufid)
         throw printf("Invalid buffer identifier %d", a:bufid)
     endif
 
+    " if we can't move the cursor in another window, then we have to select it.
+    if !(exists('*nvim_win_set_cursor') || exists('*win_execute'))
+        return incpy#ui#window#tail_by_selecting(a:bufid)
+    endif
+
+    " figure out which windows have not been moved since the buffer changed.
+    let l:changedtick = getbufvar(a:bufid, 'changedtick')
+    let l:windows = filter(win_findbuf(a:bufid), 'get(s:followed, v:val, -1) != l:changedtick')
+
+    for l:window in l:windows
+        if exists('*nvim_win_set_cursor')
+            call nvim_win_set_cursor(l:window, [nvim_buf_line_count(a:bufid), 0])
+        else
+            call win_execute(l:window, 'call cursor(line("$"), 1)', 'silent')
+        endif
+        let s:followed[l:window] = l:changedtick
+    endfor
+
+    " forget about any windows that have been closed.
+    call filter(s:followed, 'win_id2tabwin(str2nr(v:key))[0] > 0')
+endfunction
+
+" Tail the windows showing the buffer a:bufid by selecting each one of them.
+" This is only used when we can't move the cursor in another window directly.
+function! incpy#ui#window#tail_by_selecting(bufid)
+
     " tail the window that's using the specified buffer id
     let last = incpy#ui#window#select(bufwinnr(a:bufid))
     if winnr() == bufwinnr(a:bufid)
@@ -34,7 +65,7 @@ function! incpy#ui#window#tail(bufid)
         let tc = tabpagenr()
         for tn in range(tabpagenr('$'))
             if index(tabpagebuflist(1 + tn), a:bufid) > -1
-                execute printf("tabnext %d", tn)
+                execute printf("tabnext %d", 1 + tn)
                 let tl = incpy#ui#window#select(bufwinnr(a:bufid))
                 keepjumps noautocmd normal gg
                 keepjumps noautocmd normal G
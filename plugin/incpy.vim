@@ -63,7 +63,11 @@
 " file. The available options are as follows.
 "
 " string g:incpy#Program      -- name of subprogram (if empty, use vim's internal python).
+" dict   g:incpy#ProgramOptions -- options for monitoring the subprogram when not using the terminal api.
 " bool   g:incpy#OutputFollow -- flag that specifies to tail the output of the subprogram.
+" int    g:incpy#OutputRate   -- the maximum number of times per second to update the buffer with the output of the subprogram.
+" int    g:incpy#ScrollbackLines -- the maximum number of lines to keep in the output buffer (0 is unlimited).
+" int    g:incpy#ScrollbackBytes -- the maximum number of bytes to keep in the output buffer (0 is unlimited).
 " any    g:incpy#InputStrip   -- when executing input, specify whether to strip leading indentation.
 " bool   g:incpy#Echo         -- when executing input, echo it to the "Scratch" buffer.
 " string g:incpy#HelpFormat   -- the formatspec to use when getting help on an expression.
@@ -71,6 +75,7 @@
 " string g:incpy#EchoFormat   -- the formatspec for each line of code being emitted.
 " string g:incpy#EvalFormat   -- the formatspec to evaluate and emit an expression with.
 " any    g:incpy#EvalStrip    -- describes how to strip input before being evaluated
+" bool   g:incpy#EvalSingle   -- when using vim's internal python, display the result of the last expression instead of using g:incpy#EvalFormat.
 " string g:incpy#ExecFormat   -- the formatspec to execute an expression with.
 " string g:incpy#ExecStrip    -- describes how to strip input before being executed
 "
@@ -82,12 +87,15 @@
 " string g:incpy#WindowPosition -- the position at which to create the window. can be
 "                                  either "above", "below", "left", or "right".
 " string g:incpy#PythonStartup  -- the name of the dotfile to seed python's globals with.
+" bool   g:incpy#InternalThread -- execute code for vim's internal python on a worker thread.
+" float  g:incpy#InternalTimeout -- the number of seconds before code on the worker thread is interrupted (0 is unlimited).
 "
 " bool   g:incpy#Terminal   -- whether to use the terminal api for external interpreters.
 " bool   g:incpy#Greenlets  -- whether to use greenlets for external interpreters.
 "
 " string g:incpy#PluginName     -- the internal name of the plugin, used during logging.
 " string g:incpy#PackageName    -- the internal package name, found in sys.modules.
+" string g:incpy#BytecodeCache  -- the directory to cache the compiled python modules in (empty disables it).
 "
 " Todo:
 " - When the filetype of the current buffer was specified, the target output buffer
@@ -161,6 +169,23 @@ function! incpy#LoadPlugin()
     " window when the "VimEnter" autocmd event has been triggered.
     autocmd VimEnter * if g:incpy#WindowStartup | call incpy#Show() | endif
 
+    " keep track of the window showing the interpreter output so that showing
+    " it does not need to query every window when it is already visible.
+    augroup incpy-view
+        autocmd!
+        for event in ['WinNew', 'WinClosed', 'TabEnter', 'BufWinEnter']
+            if exists(printf('##%s', event))
+                execute printf('autocmd %s * call incpy#interpreter#track(%s)', event, incpy#string#quote_single(event))
+            endif
+        endfor
+    augroup END
+
+    " discard any of the cached buffer lookups whenever the buffer list changes.
+    augroup incpy-buffers
+        autocmd!
+        autocmd BufNew,BufAdd,BufDelete,BufWipeout,BufFilePost * call incpy#internal#invalidate_buffers(g:incpy#PackageName)
+    augroup END
+
     " if we're using an external program, then we can just ignore the dotfile
     " since it really only makes sense when using the python interpreter.
     if g:incpy#Program == ""
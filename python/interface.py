@@ -1,4 +1,4 @@
-import sys, functools, codecs, operator, itertools, contextlib
+import sys, codecs, operator, itertools, contextlib, json
 from . import integer_types, string_types, logger
 
 logger = logger.getChild(__name__)
@@ -17,42 +17,39 @@ else:
         except ImportError:
             import collections
 
-        class _autofixlist(collections.MutableMapping):
+        class _autofixlist(collections.MutableSequence):
+            __slots__ = ('__backing__', '__children__')
             def __init__(self, backing):
-                self.__backing__ = backing
+                self.__backing__, self.__children__ = backing, {}
             def __len__(self):
                 return len(self.__backing__)
             def __iter__(self):
-                for item in self.__backing__:
-                    if isinstance(res, bytes):
-                        yield item.decode('iso8859-1')
-                    elif hasattr(_vim, 'Dictionary') and isinstance(res, _vim.Dictionary):
-                        yield vim._autofixdict(item)
-                    elif hasattr(_vim, 'List') and isinstance(res, _vim.List):
-                        yield vim._autofixlist(item)
-                    else:
-                        yield item
-                    continue
+                for index, item in enumerate(self.__backing__):
+                    yield vim._autofix(self.__children__, index, item)
                 return
-            def __insert__(self, index, value):
-                self.__backing__.insert(index, value)
+            def insert(self, index, value):
+                self.__children__.clear()
+                self.__backing__[index:index] = [value]
             def __getitem__(self, index):
                 res = self.__backing__[index]
                 if isinstance(res, bytes):
                     return res.decode('iso8859-1')
-                elif hasattr(_vim, 'Dictionary') and isinstance(res, _vim.Dictionary):
-                    return vim._autofixdict(res)
-                elif hasattr(_vim, 'List') and isinstance(res, _vim.List):
-                    return vim._autofixlist(res)
-                return res
+                elif isinstance(index, slice):
+                    return [vim._autofix({}, None, item) for item in res]
+                decoder = vim._autofix_decoders.get(type(res))
+                return decoder(self.__children__, index, res) if decoder else res
             def __setitem__(self, index, value):
+                self.__children__.clear() if isinstance(index, slice) else self.__children__.pop(index, None)
                 self.__backing__[index] = value
             def __delitem__(self, index):
+                self.__children__.clear()
                 del self.__backing__[index]
 
         class _autofixdict(collections.MutableMapping):
+            __slots__ = ('__backing__', '__children__')
+            __encoded__ = {}
             def __init__(self, backing):
-                self.__backing__ = backing
+                self.__backing__, self.__children__ = backing, {}
             def __iter__(self):
                 for name in self.__backing__.keys():
                     yield name.decode('iso8859-1') if isinstance(name, bytes) else name
@@ -60,22 +57,52 @@ else:
             def __len__(self):
                 return len(self.__backing__)
             def __getitem__(self, name):
-                rname = name.encode('iso8859-1')
+                rname = self.__encoded__.get(name) or self.__encoded__.setdefault(name, name.encode('iso8859-1'))
                 res = self.__backing__[rname]
                 if isinstance(res, bytes):
                     return res.decode('iso8859-1')
-                elif hasattr(_vim, 'Dictionary') and isinstance(res, _vim.Dictionary):
-                    return vim._autofixdict(res)
-                elif hasattr(_vim, 'List') and isinstance(res, _vim.List):
-                    return vim._autofixlist(res)
-                return res
+                decoder = vim._autofix_decoders.get(type(res))
+                return decoder(self.__children__, rname, res) if decoder else res
             def __setitem__(self, name, value):
-                rname = name.encode('iso8859-1')
+                rname = self.__encoded__.get(name) or self.__encoded__.setdefault(name, name.encode('iso8859-1'))
+                self.__children__.pop(rname, None)
                 self.__backing__[rname] = value
             def __delitem__(self, name):
-                realname = name.encode('iso8859-1')
+                rname = self.__encoded__.get(name) or self.__encoded__.setdefault(name, name.encode('iso8859-1'))
+                self.__children__.pop(rname, None)
                 del self.__backing__[rname]
 
+        # the decoders for the containers within a vim.List or vim.Dictionary are
+        # chosen by the type of each value, and are determined once when loaded.
+        _autofix_decoders = {}
+
+        @staticmethod
+        def _autofix_container(wrapper):
+            '''Return a decoder that wraps a container using `wrapper` and reuses the wrapper for its key.'''
+            def decode(children, key, value):
+                child = children.get(key)
+                if type(child) is wrapper:
+                    child.__backing__ = value
+                    return child
+                child = wrapper(value)
+                if key is not None:
+                    children[key] = child
+                return child
+            return decode
+
+        if hasattr(_vim, 'Dictionary'):
+            _autofix_decoders[_vim.Dictionary] = _autofix_container.__func__(_autofixdict)
+        if hasattr(_vim, 'List'):
+            _autofix_decoders[_vim.List] = _autofix_container.__func__(_autofixlist)
+
+        @staticmethod
+        def _autofix(children, key, value):
+            '''Decode the `value` for the specified `key` by using the decoder for its type.'''
+            if isinstance(value, bytes):
+                return value.decode('iso8859-1')
+            decoder = vim._autofix_decoders.get(type(value))
+            return decoder(children, key, value) if decoder else value
+
         class _accessor(object):
             def __init__(self, *result, **callables):
                 if result:
@@ -112,34 +139,41 @@ else:
         # converters
         @classmethod
         def _to(cls, n):
+            '''Return an expression that evaluates to the value `n` when it is evaluated by vim.'''
+            if isinstance(n, bool):
+                return 'v:true' if n else 'v:false'
             if isinstance(n, integer_types):
-                return str(n)
-            if isinstance(n, float):
-                return "{:f}".format(n)
-            if isinstance(n, string_types):
-                return "{!r}".format(n)
-            if isinstance(n, list):
-                return "[{:s}]".format(','.join(map(cls._to, n)))
-            if isinstance(n, dict):
-                return "{{{:s}}}".format(','.join((':'.join((cls._to(k), cls._to(v))) for k, v in n.items())))
-            raise Exception("Unknown type {:s} : {!r}".format(type(n),n))
+                return "{:d}".format(n)
+
+            # anything else is serialized as json so that vim can decode it.
+            try:
+                serialized = json.dumps(n)
+            except (TypeError, ValueError):
+                raise Exception("Unknown type {:s} : {!r}".format(type(n),n))
+            return "json_decode('{:s}')".format(serialized.replace("'", "''"))
 
         @classmethod
         def _from(cls, n):
+            '''Return the value that is encoded as json by the string `n`.'''
+            return json.loads(n)
+
+        @classmethod
+        def _from_strings(cls, n):
+            '''Return the value `n` from `vim.eval` with its strings converted to the type that they look like.'''
             if isinstance(n, string_types):
                 if n.startswith('['):
-                    return cls._from(eval(n))
+                    return cls._from_strings(eval(n))
                 if n.startswith('{'):
-                    return cls._from(eval(n))
+                    return cls._from_strings(eval(n))
                 try: return float(n) if '.' in n else float('.')
                 except ValueError: pass
                 try: return int(n)
                 except ValueError: pass
                 return str(n)
             if isinstance(n, list):
-                return [ cls._from(item) for item in n ]
+                return [ cls._from_strings(item) for item in n ]
             if isinstance(n, dict):
-                return { str(k) : cls._from(v) for k, v in n.items() }
+                return { str(k) : cls._from_strings(v) for k, v in n.items() }
             return n
 
         # error class
@@ -152,6 +186,9 @@ else:
         current = _accessor(_vim.current)
         tabpages = _accessor(_vim.tabpages)
 
+        # the number of round-trips that have been made to the editor
+        roundtrips = {'command': 0, 'eval': 0}
+
         # vim.command and evaluation (local + remote)
         if _vim.eval('has("clientserver")') and not 'enabled':
 
@@ -165,31 +202,54 @@ else:
 
             @classmethod
             def command(cls, string):
+                cls.roundtrips['command'] += 1
                 cmd, escape, exitmode = string.replace("'", "''"), '', ''
                 remote = "call remote_send(v:servername, \"{:s}\" . ':' . '{:s}' . \"{:s}\")".format(exitmode, cmd, r'\n')
                 return _vim.command(remote)
 
             @classmethod
             def eval(cls, string):
+                cls.roundtrips['eval'] += 1
                 cmd = string.replace("'", "''")
                 remote = "remote_expr(v:servername, '{:s}')".format(cmd)
                 serialized = _vim.eval(remote)
                 if '\n' in serialized:
-                    iterable = (cls._from(line) for line in serialized.split('\n') if line)
+                    iterable = (cls._from_strings(line) for line in serialized.split('\n') if line)
                     return [item for item in iterable]
-                return cls._from(serialized)
+                return cls._from_strings(serialized)
 
         else:
             @classmethod
-            def command(cls, string): return _vim.command(string)
+            def command(cls, string):
+                cls.roundtrips['command'] += 1
+                return _vim.command(string)
             @classmethod
-            def eval(cls, string): return cls._from(_vim.eval(string))
+            def eval(cls, string):
+                cls.roundtrips['eval'] += 1
+
+                # the value is encoded by a function that converts anything that can't
+                # be encoded as json (a funcref, job, or channel) to a string. this way
+                # the expression is evaluated once even if it has one of those types.
+                return cls._from(_vim.eval("incpy#internal#encode({:s})".format(string)))
 
         @classmethod
         def has(cls, feature):
             '''Return whether the editor supports the requested feature.'''
             return cls.eval("has('{:s}')".format(feature.replace("'", "''")))
 
+        @classmethod
+        def json(cls, string):
+            '''Evaluate the expression in `string` and return its value with the types of its contents preserved.'''
+            cls.roundtrips['eval'] += 1
+            return cls._from(_vim.eval("json_encode({:s})".format(string)))
+
+        @classmethod
+        def batch(cls, *expressions):
+            '''Evaluate each of the specified expressions as a single list and return their values with their types preserved.'''
+            if not expressions:
+                return []
+            return cls.json("[{:s}]".format(','.join(expressions)))
+
         # global variables
         if hasattr(_vim, 'vars'):
             gvars = _autofixdict(_vim.vars) if hasattr(_vim, 'Dictionary') and isinstance(_vim.vars, _vim.Dictionary) else _vim.vars
@@ -244,10 +304,65 @@ else:
 
         class buffer(object):
             """Internal vim commands for getting information about a buffer"""
-            name = staticmethod(lambda number: str(vim.eval("bufname({!s})".format(number))))
-            exists = staticmethod(lambda number: bool(vim.eval("bufexists({!s})".format(number))))
-            count = staticmethod(lambda *attribute: sum(1 for info in filter(operator.itemgetter(*attribute) if attribute else None, vim.eval('getbufinfo()'))))
-            available = staticmethod(lambda *attribute: {info['bufnr'] for info in filter(operator.itemgetter(*attribute) if attribute else None, vim.eval('getbufinfo()'))})
+
+            # the buffer lookups are cached until the generation is changed
+            # by an autocommand that is executed when the buffer list changes.
+            generation, __cache = 0, {}
+
+            @classmethod
+            def invalidate(cls):
+                '''Discard the cached buffer lookups by increasing the generation.'''
+                cls.generation += 1
+                return cls.generation
+
+            @classmethod
+            def __lookup(cls):
+                '''Return the buffer lookups for the current generation.'''
+                cache, count = cls.__cache, len(vim.buffers)
+
+                # the autocommands for deleting or wiping out a buffer are executed
+                # before it is removed, so the cache could've been rebuilt while it
+                # was still there. so we also verify the number of buffers hasn't
+                # changed, since counting them doesn't need to evaluate anything.
+                if cache.get('generation') == cls.generation and cache.get('count') == count:
+                    return cache
+
+                # grab the number and both names for every buffer in a single query.
+                [infos] = vim.batch("map(getbufinfo(), '[v:val.bufnr, bufname(v:val.bufnr), v:val.name]')")
+                names = {number : name for number, name, _ in infos}
+                numbers = {name : number for number, _, name in infos if name}
+                numbers.update({name : number for number, name, _ in infos if name})
+
+                cache.clear()
+                cache.update(generation=cls.generation, count=count, names=names, numbers=numbers, buffers={})
+                return cache
+
+            @classmethod
+            def name(cls, number):
+                '''Return the name of the specified buffer number.'''
+                names = cls.__lookup()['names']
+                return names[number] if number in names else str(vim.eval("bufname({!s})".format(number)))
+
+            @classmethod
+            def exists(cls, number):
+                '''Return whether the specified buffer number exists.'''
+                if isinstance(number, integer_types):
+                    return number in cls.__lookup()['names']
+                return bool(vim.eval("bufexists({!s})".format(number)))
+
+            @classmethod
+            def count(cls, *attribute):
+                '''Return the number of buffers that have the specified attribute set.'''
+                if not attribute:
+                    return len(cls.__lookup()['names'])
+                return sum(1 for info in filter(operator.itemgetter(*attribute), vim.eval('getbufinfo()')))
+
+            @classmethod
+            def available(cls, *attribute):
+                '''Return the numbers for the buffers that have the specified attribute set.'''
+                if not attribute:
+                    return {number for number in cls.__lookup()['names']}
+                return {info['bufnr'] for info in filter(operator.itemgetter(*attribute), vim.eval('getbufinfo()'))}
 
             # utilities for finding a window using its buffer id
             @classmethod
@@ -262,6 +377,7 @@ else:
             def new(cls, name):
                 '''Add a new buffer with the specified name and return its buffer number.'''
                 vim.command("silent! badd {:s}".format(name))
+                cls.invalidate()
                 return cls.of(name)
 
             @classmethod
@@ -272,15 +388,22 @@ else:
                 if vim.vvars['dying']:
                     return
                 vim.command("silent! bdelete! {:d}".format(number))
+                cls.invalidate()
 
             @classmethod
             def by(cls, number):
                 '''Return the `vim.Buffer` object for the specified buffer number.'''
+                buffers = cls.__lookup()['buffers']
+                if number in buffers:
+                    return buffers[number]
+
+                # if the buffer isn't cached, then scan for it and cache the result.
                 iterable = (buffer for buffer in vim.buffers)
                 filtered = (buffer for buffer in iterable if buffer.number == number)
                 result = next(filtered, None)
                 if result is None:
                     raise vim.error("Unable to find buffer from number ({!s})".format(number))
+                buffers[number] = result
                 return result
 
             @classmethod
@@ -289,28 +412,41 @@ else:
                 if isinstance(identity, vim.Buffer):
                     return identity.number
 
-                # Grab the info using identity as a buffer number.
+                # Check the cache for the buffer number or an exact name.
+                cache = cls.__lookup()
+                if isinstance(identity, integer_types) and identity in cache['names']:
+                    return identity
+                elif isinstance(identity, string_types) and identity in cache['numbers']:
+                    return cache['numbers'][identity]
+
+                # Use identity as a buffer number.
                 elif isinstance(identity, integer_types):
-                    infos = vim.eval("getbufinfo({:d})".format(identity))
+                    parameter = "{:d}".format(identity)
 
-                # Grab the info using identity as a buffer name.
+                # Use identity as a buffer name.
                 elif isinstance(identity, string_types):
                     escaped = identity.replace("'", "''")
-                    infos = vim.eval("getbufinfo('{:s}')".format(escaped))
+                    parameter = "'{:s}'".format(escaped)
 
                 # We don't support any other types...
                 else:
                     raise vim.error("Unable to determine buffer from parameter type : {!s}".format(identity))
 
+                # Grab the buffer number from its info along with whether it exists.
+                [infos] = vim.batch("map(getbufinfo({:s}), '[v:val.bufnr, bufexists(v:val.bufnr)]')".format(parameter))
+
                 # Extract our results from the buffer info that we queried.
-                results = {int(info['bufnr']) for info in infos}
+                results = {number : exists for number, exists in infos}
                 if len(results) != 1:
                     raise vim.error("Unable to find buffer from parameter : {!s}".format(identity))
-                [number] = results
+                [(number, exists)] = results.items()
 
                 # Verify that the buffer actually exists before returning it.
-                if not cls.exists(number):
+                if not exists:
                     raise vim.error("Unable to find buffer from parameter : {!s}".format(identity))
+
+                # Cache the name that we were given for the current generation.
+                isinstance(identity, string_types) and cache['numbers'].setdefault(identity, number)
                 return number
 
             @classmethod
@@ -426,6 +562,92 @@ else:
                 identifiers = itertools.chain(*(info['windows'] for info in filtered))
                 return {int(windowid) for windowid in identifiers}
 
+        class layout(object):
+            """Internal snapshot of the windows for every tab and the buffers that are available"""
+            windows_query = "map(getwininfo(), '[v:val.winid, v:val.tabnr, v:val.winnr, v:val.bufnr, v:val.width, v:val.height, win_gettype(v:val.winid)]')"
+            buffers_query = "map(getbufinfo(), '[v:val.bufnr, v:val.name]')"
+
+            def __init__(self):
+                tab, window, windows, buffers = vim.batch('tabpagenr()', 'win_getid()', self.windows_query, self.buffers_query)
+                self.__current = tab, window
+
+                # index the window information by its id, and the buffer names by their number.
+                self.__windows = {windowid : (tab, number, buffer, (width, height)) for windowid, tab, number, buffer, width, height, _ in windows}
+                self.__types = {windowid : None if type == 'unknown' else type for windowid, _, _, _, _, _, type in windows}
+                self.__buffers = {number : name for number, name in buffers}
+
+            def __repr__(self):
+                cls, (tab, window) = self.__class__, self.__current
+                return "<{:s} tab:{:d} window:{:d} windows:{:d} buffers:{:d}>".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__]), tab, window, len(self.__windows), len(self.__buffers))
+
+            def __info(self, windowid):
+                if windowid not in self.__windows:
+                    raise vim.error("Unable to get window information for the specified id ({:d})".format(windowid))
+                return self.__windows[windowid]
+
+            def current(self):
+                '''Return the current tab page number and window id from the snapshot.'''
+                return self.__current
+
+            def exists(self, windowid):
+                '''Return whether the window with the specified id exists in the snapshot.'''
+                return windowid in self.__windows
+
+            def tab_and_number(self, windowid):
+                '''Return the tab and window number for the window with the specified id.'''
+                tab, number, _, _ = self.__info(windowid)
+                return tab, number
+
+            def tab(self, windowid):
+                '''Return the tab number for the window with the specified id.'''
+                tab, _ = self.tab_and_number(windowid)
+                return tab
+
+            def number(self, windowid):
+                '''Return the window number for the window with the specified id.'''
+                _, number = self.tab_and_number(windowid)
+                return number
+
+            def buffer(self, windowid):
+                '''Return the buffer number for the window with the specified id.'''
+                _, _, buffer, _ = self.__info(windowid)
+                return buffer
+
+            def dimensions(self, windowid):
+                '''Return the dimensions for the window with the specified id.'''
+                _, _, _, dimensions = self.__info(windowid)
+                return dimensions
+
+            def type(self, windowid):
+                '''Return the type for the window with the specified id as a string.'''
+                self.__info(windowid)
+                return self.__types[windowid]
+
+            def windows(self, *tab):
+                '''Return the window ids for the specified tab or all available tabs.'''
+                iterable = self.__windows.items()
+                return {windowid for windowid, (wtab, _, _, _) in iterable if not tab or operator.eq(wtab, *tab)}
+
+            def buffers(self, *tab):
+                '''Return the buffer numbers that are shown by the windows in the specified tab or all available tabs.'''
+                iterable = self.__windows.values()
+                return {buffer for wtab, _, buffer, _ in iterable if not tab or operator.eq(wtab, *tab)}
+
+            def showing(self, number, *tab):
+                '''Return the window ids that are showing the specified buffer number in the specified tab or all available tabs.'''
+                iterable = self.__windows.items()
+                return {windowid for windowid, (wtab, _, buffer, _) in iterable if buffer == number and (not tab or operator.eq(wtab, *tab))}
+
+            def available(self):
+                '''Return the numbers for all of the buffers in the snapshot.'''
+                return {number for number in self.__buffers}
+
+            def name(self, number):
+                '''Return the name of the buffer with the specified number.'''
+                if number not in self.__buffers:
+                    raise vim.error("Unable to find buffer from number ({!s})".format(number))
+                return self.__buffers[number]
+
         class terminal(object):
             """Internal vim commands for interacting with terminal jobs by their buffer number"""
             exists = staticmethod(lambda buffer: len(vim.eval("term_getsize({:d})".format(buffer))) > 0)
@@ -560,7 +782,7 @@ else:
                 # still honor the sleep timeout, though, if we received one.
                 timeout and vim.eval("wait({:f}, {:s})".format(max(0, *timeout), 'v:false'))
 
-        dimensions = _accessor(get=lambda: tuple(int(vim.eval('&' + option)) for option in ['columns', 'lines']))
+        dimensions = _accessor(get=lambda: tuple(vim.batch('&columns', '&lines')))
         width = _accessor(get=lambda: int(vim.eval('&columns')))
         height = _accessor(get=lambda: int(vim.eval('&lines')))
         available_buffers = _accessor(get=lambda: {int(info['bufnr']) for info in vim.eval('getbufinfo()')})
@@ -579,22 +801,140 @@ else:
         # add a property that selects between the regular terminal class and the neovim flavor'd one.
         terminal = _accessor(get=lambda terminal=terminal, neo=neoterminal: neo if vim.has('nvim') else terminal)
 
+class lineindex(object):
+    """prefix sums of the lengths of each line in a buffer
+
+    This is a binary-indexed (Fenwick) tree that is used for converting a
+    character position into a line number and column. Lines are appended,
+    updated, or removed from either end without rebuilding the tree.
+    """
+
+    def __init__(self, sizes=()):
+        self.reset(sizes)
+
+    def reset(self, sizes=()):
+        '''Rebuild the index from the specified iterable of line sizes.'''
+        self.__sizes = sizes = [size for size in sizes]
+        self.__tree = tree = [0] + sizes
+        self.__base = 0
+
+        # build the tree in place by adding each node to its parent.
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+            continue
+        return
+
+    def __len__(self):
+        return len(self.__sizes) - self.__base
+
+    def __getitem__(self, index):
+        return self.__sizes[self.__base + index]
+
+    def __prefix(self, count):
+        '''Return the sum of the first `count` sizes including the ones that have been removed.'''
+        tree, res = self.__tree, 0
+        while count > 0:
+            res, count = res + tree[count], count & (count - 1)
+        return res
+
+    def offset(self, index):
+        '''Return the position of the first character of the line at `index`.'''
+        return self.__prefix(self.__base + index) - self.__prefix(self.__base)
+
+    def total(self):
+        '''Return the sum of the size of every line in the index.'''
+        return self.offset(len(self))
+
+    def find(self, position):
+        '''Return the line and column that contains the character at `position`.'''
+        tree, base = self.__tree, self.__base
+        target = max(0, position) + self.__prefix(base)
+
+        # descend the tree for the largest count whose prefix fits the target.
+        count, step = 0, 1 << (len(tree) - 1).bit_length()
+        while step:
+            if count + step < len(tree) and tree[count + step] <= target:
+                count, target = count + step, target - tree[count + step]
+            step >>= 1
+
+        # clamp the line to the ones that are available in the index.
+        if count - base >= len(self):
+            count = len(self.__sizes) - 1
+            return count - base, self.__sizes[count]
+        return count - base, target
+
+    def update(self, index, size):
+        '''Change the size of the line at `index` to `size`.'''
+        tree, absolute = self.__tree, self.__base + index
+        delta, self.__sizes[absolute] = size - self.__sizes[absolute], size
+        absolute += 1
+        while absolute < len(tree):
+            tree[absolute] += delta
+            absolute += absolute & -absolute
+        return
+
+    def append(self, size):
+        '''Append the size of a new line to the end of the index.'''
+        tree, count = self.__tree, len(self.__tree)
+        tree.append(size + self.__prefix(count - 1) - self.__prefix(count - (count & -count)))
+        self.__sizes.append(size)
+
+    def extend(self, sizes):
+        '''Append the size of each line from the specified iterable to the end of the index.'''
+        for size in sizes:
+            self.append(size)
+        return
+
+    def truncate(self, count):
+        '''Remove every line from the index after the first `count` lines.'''
+        absolute = self.__base + max(0, count)
+        del self.__sizes[absolute:]
+        del self.__tree[1 + absolute:]
+
+    def popleft(self, count):
+        '''Remove the first `count` lines from the index.'''
+        self.__base = base = min(self.__base + max(0, count), len(self.__sizes))
+
+        # the removed lines are only skipped, so rebuild once they are the majority.
+        if base > len(self.__sizes) // 2:
+            self.reset(self.__sizes[base:])
+        return
+
 class buffer(object):
-    """vim buffer management"""
+    """vim buffer management
+
+    If `lines` or `bytes` is non-zero, then the buffer is used as scrollback
+    and its oldest lines are removed once it grows larger than either limit.
+    """
+
+    # The fraction of the scrollback limit that the buffer can exceed before it
+    # is trimmed. This way lines are removed in large batches, not every write.
+    slack = 0.125
 
     @classmethod
-    def new(cls, name_or_number_or_buffer):
+    def new(cls, name_or_number_or_buffer, **limits):
         if isinstance(name_or_number_or_buffer, type(vim.current.buffer)):
-            return cls(name_or_number_or_buffer.number)
+            return cls(name_or_number_or_buffer.number, **limits)
         elif isinstance(name_or_number_or_buffer, string_types):
-            return cls(vim.buffer.new(name_or_number_or_buffer))
+            return cls(vim.buffer.new(name_or_number_or_buffer), **limits)
         elif not vim.buffer.exists(name_or_number_or_buffer):
             raise vim.error("Unable to find buffer from parameter : {!s}".format(name_or_number_or_buffer))
-        return cls(name_or_number_or_buffer)
+        return cls(name_or_number_or_buffer, **limits)
 
     # Scope
-    def __init__(self, number):
+    def __init__(self, number, lines=0, bytes=0):
         self.buffer = vim.buffers[number]
+        self.__name = self.buffer.name
+        self.limits = max(0, lines or 0), max(0, bytes or 0)
+        self.__size = sum(map(self.__line_size, self.buffer))
+
+        # the index maps a character position to its line, and the position
+        # is where the next read starts. writes always append to the end.
+        self.__index = lineindex(len(line) + 1 for line in self.buffer)
+        self.__position = 0
+        self.__tick = self.__changedtick(self.buffer)
 
     def close(self):
         res = self.buffer.number
@@ -610,57 +950,173 @@ class buffer(object):
     exists = property(fget=lambda self: vim.buffer.exists(self.buffer.number))
 
     # Things that make this look like a file.
-    def __get_buffer_index(self):
-        position = 0
-        for item in self.buffer:
-            yield position, item
-            position += len(item)
-        return
-
     def flush(self):
         return
 
+    @staticmethod
+    def __line_size(line):
+        '''Return the number of bytes used by `line` including its newline.'''
+        return 1 + len(line if isinstance(line, bytes) else line.encode('utf-8', 'replace'))
+
+    def __resolve(self):
+        '''Return the `vim.Buffer` for this instance, only looking it up again if it has been wiped.'''
+        if getattr(self.buffer, 'valid', True):
+            return self.buffer
+        self.buffer = res = vim.buffer.by(vim.buffer.of(self.__name))
+        return res
+
+    @staticmethod
+    def __changedtick(buffer):
+        '''Return the "b:changedtick" variable of `buffer`, which is incremented every time that it is modified.'''
+        variables = getattr(buffer, 'vars', {})
+        if 'changedtick' in variables:
+            return variables['changedtick']
+        return vim.eval("getbufvar({:d}, 'changedtick')".format(buffer.number))
+
+    def __synchronize(self, buffer):
+        '''Rebuild the line index if the buffer was changed without using this instance.'''
+        tick = self.__changedtick(buffer)
+        if tick != self.__tick:
+            self.__index.reset(len(line) + 1 for line in buffer)
+            self.__size = sum(map(self.__line_size, buffer))
+            self.__tick = tick
+        return self.__index
+
     def write(self, data):
-        lines = iter(data.split('\n'))
-        with vim.buffer.update(self.buffer) as buffer:
-            if not(len(buffer)): buffer[:] = ['']
-            buffer[-1] += next(lines)
-            [ buffer.append(item) for item in lines ]
+        buffer, lines = self.__resolve(), data.split('\n')
+        index = self.__synchronize(buffer)
+
+        # we only need to change the 'modifiable' option if it was disabled.
+        modifiable = buffer.options['modifiable'] if 'modifiable' in buffer.options else True
+        try:
+            if not modifiable:
+                buffer.options['modifiable'] = True
+
+            # replace the last line with itself and every new line at once.
+            if not(len(buffer)):
+                buffer[:] = ['']
+                index.reset([1])
+            last = len(buffer) - 1
+            buffer[last:] = [buffer[last] + lines[0]] + lines[1:]
+
+            # update the index with the new size of the last line and each new one.
+            index.update(last, index[last] + len(lines[0]))
+            index.extend(len(line) + 1 for line in lines[1:])
+            self.__position = index.total() - 1
+
+            self.__size += len(data if isinstance(data, bytes) else data.encode('utf-8', 'replace'))
+            any(self.limits) and self.__trim(buffer)
+            self.__tick = self.__changedtick(buffer)
+
+        finally:
+            if not modifiable:
+                buffer.options['modifiable'] = modifiable
+            pass
         return
 
+    def __trim(self, buffer):
+        '''Remove the oldest lines from the buffer if it has grown past the scrollback limits.'''
+        maxlines, maxbytes = self.limits
+        count, slack = len(buffer), self.slack
+
+        # figure out how many lines need to be removed in order to satisfy
+        # each limit. we leave the buffer alone until the limit has been
+        # exceeded by the slack so that the trimming is amortized.
+        excess = count - maxlines if maxlines and count > maxlines + max(1, int(maxlines * slack)) else 0
+        if maxbytes and self.__size > maxbytes + max(1, int(maxbytes * slack)):
+            excess = max(excess, 1)
+
+        # never remove the last line, since that's where we continue writing.
+        excess, removed = min(excess, count - 1), 0
+        if excess <= 0:
+            return
+
+        # if we're over our byte limit, then continue collecting lines until
+        # we're within it. we fetch lines in chunks to avoid copying the buffer.
+        chunk, index = max(0x100, excess), 0
+        iterable = (buffer[offset : min(offset + chunk, count - 1)] for offset in range(0, count - 1, chunk))
+        for line in itertools.chain.from_iterable(iterable):
+            if index >= excess and (not maxbytes or self.__size - removed <= maxbytes):
+                break
+            removed, index = removed + self.__line_size(line), index + 1
+
+        # deleting the lines will also adjust the cursor of every window that
+        # is displaying the buffer, so anybody following the output stays put.
+        del buffer[:index]
+        self.__size -= removed
+
+        # the position of everything left has moved by the characters that were removed.
+        characters = self.__index.offset(index)
+        self.__index.popleft(index)
+        self.__position = max(0, self.__position - characters)
+
     def writable(self):
         return False
 
     def truncate(self, pos=None):
+        buffer = self.__resolve()
+        index = self.__synchronize(buffer)
         if pos is None:
-            self.buffer[:] = ['']
+            buffer[:] = ['']
+            self.__size = 1
+            index.reset([1])
         else:
-            iterable = ((index, item) for index, item in self.__get_buffer_index())
-            iterable, complete = itertools.tee(iterable)
-            count = sum(1 for item in itertools.takewhile(functools.partial(operator.gt, pos), map(operator.itemgetter(0), iterable)))
-            sliced = [item for item in itertools.islice(complete, count)]
-            index, last = sliced[-1] if sliced else (0, '')
-            trimmed = itertools.chain(map(operator.itemgetter(1), sliced[:-1]), [last[:pos - index]])
-            self.buffer[:] = [item for item in trimmed]
-        return
+            line, column = index.find(max(0, pos))
+            removed = buffer[line:]
+            last = removed[0][:column] if removed else ''
+            buffer[line:] = [last]
+            self.__size += self.__line_size(last) - sum(map(self.__line_size, removed))
+
+            # only the lines after the cut are removed from the index.
+            index.truncate(line + 1)
+            index.update(line, len(last) + 1)
+        self.__tick = self.__changedtick(buffer)
+
+        # the position can't be past the end of the buffer.
+        size = index.total() - 1
+        self.__position = min(self.__position, size)
+        return size
 
-    # These exist, but aren't really intended to be implemented. The requirements
-    # for implementing these consists of tracking and updating an index that
-    # can be used for converting a character position to the buffer line number.
     def read(self, amount=-1):
-        raise NotImplementedError('read', amount)
+        buffer = self.__resolve()
+        index = self.__synchronize(buffer)
+        size = index.total() - 1
+
+        # figure out the lines containing the characters that we need to read.
+        start = min(self.__position, size)
+        stop = size if amount is None or amount < 0 else min(size, start + amount)
+        first, column = index.find(start)
+        last, _ = index.find(stop)
+
+        # join the lines and slice out the range relative to the first one.
+        offset = index.offset(first)
+        data = '\n'.join(buffer[first : last + 1])
+        self.__position = stop
+        return data[start - offset : stop - offset]
 
     def readable(self):
-        return False
+        return True
 
     def seek(self, target, whence=0):
-        raise NotImplementedError('seek', target, whence)
+        index = self.__synchronize(self.__resolve())
+        size = index.total() - 1
+
+        # calculate the new position from whichever point was specified.
+        if whence not in {0, 1, 2}:
+            raise ValueError("Invalid whence ({!s}) was specified.".format(whence))
+        position = target + [0, self.__position, size][whence]
+        if position < 0:
+            raise ValueError("Unable to seek to a negative position ({:d}).".format(position))
+
+        self.__position = min(position, size)
+        return self.__position
 
     def tell(self):
-        raise NotImplementedError('tell')
+        index = self.__synchronize(self.__resolve())
+        return min(self.__position, index.total() - 1)
 
     def seekable(self):
-        return False
+        return True
 
     def fileno(self):
         from . import interpreters
@@ -695,9 +1151,10 @@ class multiview(object):
     encoding = encoding_descriptor()
     del(encoding_descriptor)
 
-    def __init__(self, bufferobj):
-        self.__buffer__ = res = buffer.new(bufferobj)
+    def __init__(self, bufferobj, lines=0, bytes=0):
+        self.__buffer__ = res = buffer.new(bufferobj, lines=lines, bytes=bytes)
         self.windows = vim.buffer.windows(res.number)
+        self.__visible = None
 
     @property
     def buffer(self):
@@ -705,6 +1162,45 @@ class multiview(object):
             return self.__buffer__
         raise vim.error('Unable to access buffer for managing windows due to the buffer having been closed.')
 
+    @property
+    def visible(self):
+        '''Return the window id showing the buffer in the current tab if it is known and still showing it.'''
+        window = self.__visible
+        if window is None:
+            return None
+
+        # the autocommands that clear the window might not exist or could have
+        # been suppressed, so confirm the window is still showing our buffer.
+        number, buffer = vim.batch("win_id2win({:d})".format(window), "winbufnr({:d})".format(window))
+        if number > 0 and buffer == self.buffer.number:
+            return window
+        self.__visible = None
+        return None
+
+    def track(self, event, window, buffer):
+        '''Update the visible window for the buffer using the autocommand event for the specified window id and buffer number.'''
+        number = self.buffer.number
+
+        # if the current tab has changed, then we can no longer
+        # trust the window that we determined was visible.
+        if event == 'TabEnter':
+            self.__visible = None
+
+        # if a window was closed, then we only need to forget it
+        # if it was the one showing our buffer in the current tab.
+        elif event == 'WinClosed':
+            self.windows.discard(window)
+            self.__visible = None if window == self.__visible else self.__visible
+
+        # if a window was created or had a buffer entered into it, then we
+        # need to check if it is showing our buffer or stopped showing it.
+        elif event in {'WinNew', 'BufWinEnter'}:
+            self.__visible = None if number == buffer or window == self.__visible else self.__visible
+
+        else:
+            raise vim.error("Unsupported autocommand event ({:s}) was specified.".format(event))
+        return self.__visible
+
     @classmethod
     def __create_window_options(cls, options):
         result = []
@@ -737,8 +1233,7 @@ class multiview(object):
         raise ValueError(position)
 
     @classmethod
-    def __create_window_tab_keyword(cls, tab):
-        count = vim.tab.count()
+    def __create_window_tab_keyword(cls, tab, count):
         if isinstance(tab, string_types) and any([tab.startswith('new'), not(tab)]):
             return "{:s}tab".format(tab[3:] or '$') if tab else ''
         elif not isinstance(tab, integer_types):
@@ -750,11 +1245,11 @@ class multiview(object):
     @classmethod
     def __create_window(cls, number, position, size, options, tab=0):
         '''create a window for the buffer number and return its window id'''
-        last, mutable_options = vim.window.current(), options.copy()
+        [last, count], mutable_options = vim.batch('win_getid()', "tabpagenr('$')"), options.copy()
 
         location = cls.__create_window_location_keyword(position)
         split_type = cls.__create_window_split_keyword(position)
-        tabdo = cls.__create_window_tab_keyword(tab)
+        tabdo = cls.__create_window_tab_keyword(tab, count)
         location_prefix = ' '.join([tabdo, location]) if tabdo else location
 
         preview = mutable_options.pop('preview', False)
@@ -772,10 +1267,9 @@ class multiview(object):
             setlocal_command = "+{:s} ".format(option_edit_command) if option_edit_command else ''
             vim.command("noautocmd silent {:s} edit! {:s}{:s}".format(location_prefix, int(size), setlocal_command, "#{:d}".format(number)))
 
-        # grab the newly created window
-        new = vim.window.current()
+        # grab the newly created window and its buffer
+        new, newnumber = vim.batch('win_getid()', 'bufnr()')
         try:
-            newnumber = vim.window.buffer(new)
 
             # if the buffer id for the new window matches the one
             # that we've cached, then we can return the window id.
@@ -805,21 +1299,25 @@ class multiview(object):
         tabnumber = 0 if tab == vim.tab.current() else tab
         window = self.__create_window(self.buffer.number, position, size, options, tab=tabnumber)
         self.windows.add(window)
+        self.__visible = self.__visible if tabnumber else window
         return window
 
     def hide(self, window):
-        last, number = vim.window.current(), self.buffer.number
+        layout, number = vim.layout(), self.buffer.number
+        current, last = layout.current()
 
-        # first check the window type so that we can figure
-        # out which command we'll need to use to close it.
-        preview = vim.window.type(window) == 'preview'
-        if not preview and not vim.window.exists(window):
+        # if the window doesn't exist, then there's nothing to hide.
+        if not layout.exists(window):
             return self.windows.discard(window) or -1
 
+        # check the window type so that we can figure out
+        # which command we'll need to use to close it.
+        preview = layout.type(window) == 'preview'
+
         # figure out whether the window that we're hiding
         # is in the same tab or found in a different one.
-        wtab, wnumber = vim.window.tab_and_number(window)
-        tabnumber = 0 if wtab == vim.tab.current() else wtab
+        wtab, wnumber = layout.tab_and_number(window)
+        tabnumber = 0 if wtab == current else wtab
         tabdo = "{:d}tabdo".format(wtab) if tabnumber else ''
         windo = "{:d}windo".format(wnumber)
         location_prefix = ' '.join([tabdo, windo]) if tabdo else windo
@@ -834,6 +1332,7 @@ class multiview(object):
             # we've hidden a window that belongs to the user, not us.
             window not in self.windows and logger.debug("Closed an unmanaged window ({:d}) in tab ({:d}) with number ({:d}).".format(window, wtab, wnumber))
             self.windows.discard(window)
+            self.__visible = None if window == self.__visible else self.__visible
 
         # afterwards, jump back to the previous window that was in focus. we
         # can discard the error code because if the previous window was the
@@ -844,24 +1343,34 @@ class multiview(object):
 
     def show(self, tab, position, size, **options):
         number = self.buffer.number
-        tab = tab or vim.tab.current()
+
+        # if we know which window is showing our buffer in the current tab,
+        # then we can return it without having to query the whole layout.
+        visible = None if tab else self.visible
+        if visible is not None:
+            return visible
+
+        # grab a snapshot of the window layout to avoid querying each window.
+        layout = vim.layout()
+        current, _ = layout.current()
+        tab = tab or current
 
         # check if the current tab has a window open to our buffer.
         # if it doesn't, then we'll need to add a window one for it.
-        available = vim.tab.buffers(tab)
+        available = layout.buffers(tab)
         if number not in available:
             return self.add(tab, position, size, **options)
 
         # otherwise, we need to figure out the window id.
-        tabwindows = vim.tab.windows(tab)
-        windows = vim.buffer.windows(number)
+        tabwindows = layout.windows(tab)
+        windows = layout.showing(number)
         iterable = (window for window in tabwindows & windows)
 
         # we need to figure out the best window id, so we'll need to sort the windows
         # we received. we do this using the area of the window and its width or height.
-        Fkey_window_area = lambda window: (lambda width, height: width * height)(*vim.window.dimensions(window))
-        Fkey_window_width = lambda window: (lambda width, height: (width * height, width))(*vim.window.dimensions(window))
-        Fkey_window_height = lambda window: (lambda width, height: (width * height, height))(*vim.window.dimensions(window))
+        Fkey_window_area = lambda window: (lambda width, height: width * height)(*layout.dimensions(window))
+        Fkey_window_width = lambda window: (lambda width, height: (width * height, width))(*layout.dimensions(window))
+        Fkey_window_height = lambda window: (lambda width, height: (width * height, height))(*layout.dimensions(window))
         Fkey_window = Fkey_window_width if position in {'above', 'below'} else Fkey_window_height if position in {'left', 'right'} else Fkey_window_area
 
         # Now we can sort our resulting windows and grab the largest one.
@@ -869,7 +1378,8 @@ class multiview(object):
         if ordered:
             iterable = reversed(ordered)
             focused = next(iterable)
-            len(ordered) > 1 and logger.debug("Returning the currently showing window ({:d}) with the largest dimensions ({:s}) from the others ({:s}).".format(focused, "{:d}x{:d}".format(*vim.window.dimensions(focused)), ', '.join(map("{:d}".format, sorted(iterable)))))
+            len(ordered) > 1 and logger.debug("Returning the currently showing window ({:d}) with the largest dimensions ({:s}) from the others ({:s}).".format(focused, "{:d}x{:d}".format(*layout.dimensions(focused)), ', '.join(map("{:d}".format, sorted(iterable)))))
+            self.__visible = focused if tab == current else self.__visible
             return focused
 
         # Otherwise, we can just ignore trying to figure out which window
@@ -878,11 +1388,11 @@ class multiview(object):
         return -1
 
     def close(self):
-        last, number = vim.window.current(), self.buffer.number
-        tab, windows = vim.tab.current(), vim.buffer.windows(number)
+        layout, number = vim.layout(), self.buffer.number
+        (tab, last), windows = layout.current(), layout.showing(number)
 
         # Convert the window ids to a snapshot of each id keyed by the tab and window number.
-        window_locations = {window: vim.window.tab_and_number(window) for window in windows}
+        window_locations = {window: layout.tab_and_number(window) for window in windows}
 
         # Now we'll extract the tab number into a list, and remove the
         # current tab from it so that we can close those windows last.
@@ -930,7 +1440,7 @@ class multiview(object):
         try:
             self.buffer.close()
         finally:
-            buffer, self.__buffer__ = self.__buffer__, None
+            buffer, self.__buffer__, self.__visible = self.__buffer__, None, None
             vim.window.select(last) if vim.window.exists(last) else last
         return
 
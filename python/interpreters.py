@@ -1,17 +1,369 @@
-import sys, logging, abc, itertools
-from . import integer_types, string_types, interface, process, logger
+import sys, logging, abc, itertools, ast, collections, threading, traceback, time, functools
+from . import integer_types, string_types, interface, process, logger, exec_
 
 vim, logger = interface.vim, logger.getChild(__name__)
 
 # save initial state
 state = tuple(getattr(sys, _) for _ in ['stdin', 'stdout', 'stderr'])
 
+# the "exec" keyword is a statement in Py2 and only takes a closure in Py3.11
+# and later. so we build the function that executes our code objects just once.
+if sys.version_info.major < 3:
+    execute = lambda code, globals, locals, closure=None: exec_(code, globals, locals)
+else:
+    execute = eval("lambda code, globals, locals, closure=None: exec(code, globals, locals{:s})".format(', closure=closure' if sys.version_info >= (3, 11) else ''))
+
 def get_interpreter_frame(*args):
     [frame] = args if args else [sys._getframe()]
     while frame.f_back:
         frame = frame.f_back
     return frame
 
+class codecache(object):
+    """
+    This class is a least-recently-used cache of the code objects
+    that are compiled from the source code given to an interpreter.
+    Each entry is keyed by the source code and the mode that it was
+    compiled with. The "single" mode compiles every statement in the
+    "exec" mode except for a trailing expression, which is compiled
+    in the "single" mode so that its result is displayed.
+    """
+
+    def __init__(self, size=0x100, filename='<string>'):
+        self.size, self.filename = size, filename
+        self.hits = self.misses = 0
+        self.__cache = collections.OrderedDict()
+
+    def __repr__(self):
+        cls = self.__class__
+        return "<{:s} entries:{:d}/{:d} hits:{:d} misses:{:d}>".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__]), len(self.__cache), self.size, self.hits, self.misses)
+
+    def __len__(self):
+        return len(self.__cache)
+
+    def clear(self):
+        self.__cache.clear()
+        self.hits = self.misses = 0
+
+    def __call__(self, source, mode='exec'):
+        '''Return a list of the code objects that are compiled from `source` using the specified `mode`.'''
+        key = mode, source
+        if key in self.__cache:
+            self.hits, codes = self.hits + 1, self.__cache.pop(key)
+            self.__cache[key] = codes
+            return codes
+
+        # if it wasn't cached, then compile it and evict the oldest entries.
+        self.misses, codes = self.misses + 1, self.compile(source, mode)
+        self.__cache[key] = codes
+        while len(self.__cache) > max(0, self.size):
+            self.__cache.popitem(last=False)
+        return codes
+
+    def compile(self, source, mode='exec'):
+        '''Compile `source` using the specified `mode` and return a list of the code objects.'''
+        if mode != 'single':
+            return [compile(source, self.filename, mode)]
+
+        # if the last statement isn't an expression, then there's nothing to display.
+        tree = compile(source, self.filename, 'exec', ast.PyCF_ONLY_AST)
+        if not(tree.body and isinstance(tree.body[-1], ast.Expr)):
+            return [compile(tree, self.filename, 'exec')]
+
+        # otherwise, split the last expression from the other statements.
+        options = {'type_ignores': []} if 'type_ignores' in ast.Module._fields else {}
+        statements, expression = ast.Module(body=tree.body[:-1], **options), ast.Interactive(body=tree.body[-1:])
+        return [compile(statements, self.filename, 'exec'), compile(expression, self.filename, 'single')]
+
+class job(object):
+    """
+    This class represents code that was submitted to a worker and
+    is used to wait for its completion or to cancel it. Its state
+    is one of "pending", "running", "finished", "failed", or
+    "cancelled". If it took longer than its timeout, then it will
+    be cancelled and its "expired" attribute will be set.
+    """
+
+    def __init__(self, identity, codes, timeout=0):
+        self.id, self.codes, self.timeout = identity, codes, timeout
+        self.state, self.exception, self.expired = 'pending', None, False
+        self.started = self.stopped = None
+        self.__finished = threading.Event()
+
+    def __repr__(self):
+        cls = self.__class__
+        elapsed = " {:.3f}s".format((self.stopped or time.time()) - self.started) if self.started else ''
+        return "<{:s} {:d} {:s}{:s}>".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__]), self.id, self.state, elapsed)
+
+    done = property(fget=lambda self: self.__finished.is_set())
+
+    def wait(self, timeout=None):
+        '''Wait up to `timeout` seconds for the job to complete and return whether it has.'''
+        return True if self.__finished.wait(timeout) else self.__finished.is_set()
+
+    def finish(self, state, exception=None):
+        '''Mark the job as complete with the specified `state`.'''
+        self.state, self.exception, self.stopped = state, exception, time.time()
+        self.__finished.set()
+
+class worker(object):
+    """
+    This class executes the jobs for an interpreter in the order that
+    they were submitted using a dedicated thread. A running job is
+    cancelled by raising a `KeyboardInterrupt` within the thread with
+    `PyThreadState_SetAsyncExc`. This is only checked between bytecode
+    instructions, so a job that is blocked in a call to a function that
+    is not interruptible will only be cancelled when the call returns.
+    """
+
+    def __init__(self, execute, name=None):
+        self.__execute, self.__counter = execute, itertools.count()
+        self.__queue, self.__lock = process.Asynchronous.Queue(), threading.Lock()
+        self.current = None
+
+        self.thread = thread = threading.Thread(target=self.__loop, name=name or "worker-{:x}".format(id(self)))
+        thread.daemon = True
+
+    def __repr__(self):
+        cls = self.__class__
+        return "<{:s} {:s} current:{!r} pending:{:d}>".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__]), self.thread.name, self.current, self.__queue.qsize())
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit(self, codes, timeout=0):
+        '''Submit the list of code objects in `codes` to be executed and return the job for them.'''
+        res = job(next(self.__counter), codes, timeout)
+        self.__queue.put(res)
+        return res
+
+    def __interrupt(self, exception):
+        '''Raise `exception` within the thread of the worker, or clear it if it is `None`. **used internally**'''
+        import ctypes
+        identity = (ctypes.c_ulong if sys.version_info >= (3, 7) else ctypes.c_long)(self.thread.ident)
+        return ctypes.pythonapi.PyThreadState_SetAsyncExc(identity, None if exception is None else ctypes.py_object(exception))
+
+    def cancel(self, job=None, expired=False):
+        '''Cancel the specified `job` or the one that is currently running, and return whether it was cancelled.'''
+        with self.__lock:
+            job = self.current if job is None else job
+            if job is None or job.done:
+                return False
+
+            # if it's running, then interrupt the thread. otherwise we
+            # mark it as cancelled so that the thread will skip it.
+            job.expired = job.expired or expired
+            if job.state == 'running':
+                return self.__interrupt(KeyboardInterrupt) > 0
+            job.finish('cancelled')
+        return True
+
+    def stop(self, timeout=None):
+        '''Cancel every job that is pending or running and wait up to `timeout` seconds for the thread to exit.'''
+        while not self.__queue.empty():
+            try:
+                item = self.__queue.get(block=False)
+            except process.Asynchronous.QueueEmptyException:
+                break
+            item and self.cancel(item)
+        self.cancel()
+        self.__queue.put(None)
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+    def __finish(self, job, timer, state, exception):
+        '''Finish the specified `job` and clear any interrupt that was raised for it. **used internally**'''
+
+        # an interrupt can arrive at any point until it has been cleared while
+        # holding the lock, so keep trying until the job has been finished.
+        while not job.done:
+            try:
+                timer and timer.cancel()
+                with self.__lock:
+                    self.current = None if self.current is job else self.current
+                    self.__interrupt(None)
+                    job.finish(state, exception)
+            except KeyboardInterrupt:
+                state, exception = 'cancelled', sys.exc_info()[1]
+            continue
+        return job
+
+    def __run(self, job):
+        '''Execute the specified `job` within the current thread. **used internally**'''
+        timer, state, exception = None, 'cancelled', None
+        try:
+            timer = threading.Timer(job.timeout, self.cancel, args=(job, True)) if job.timeout > 0 else None
+            timer and timer.start()
+            for code in job.codes:
+                self.__execute(code)
+            state, exception = 'finished', None
+
+        except KeyboardInterrupt:
+            state, exception = 'cancelled', sys.exc_info()[1]
+            sys.stderr.write("{:s}\n".format("Job {:d} was cancelled after exceeding its timeout of {:.3f} seconds.".format(job.id, job.timeout) if job.expired else 'KeyboardInterrupt'))
+
+        except Exception:
+            state, exception = 'failed', sys.exc_info()[1]
+            traceback.print_exc()
+
+        # this also runs if an interrupt arrives while handling an exception.
+        finally:
+            self.__finish(job, timer, state, exception)
+        return
+
+    def __loop(self):
+        '''Execute each job from the queue until we receive the sentinel. **used internally**'''
+        while True:
+            try:
+                # an interrupt that arrived before the job could start running
+                # will skip its bookkeeping, so finish it before the next one.
+                if self.current is not None:
+                    self.__finish(self.current, None, 'cancelled', None)
+
+                res = self.__queue.get(block=True)
+                if res is None:
+                    break
+
+                # transition to running while holding the lock so that it
+                # can't be cancelled between being dequeued and being run.
+                with self.__lock:
+                    if res.done:
+                        continue
+                    self.current, res.state, res.started = res, 'running', time.time()
+                self.__run(res)
+
+            # an interrupt for a job that completed can race with the lock.
+            except KeyboardInterrupt:
+                continue
+        return
+
+class threadedwriter(object):
+    """
+    This class wraps a view so that anything written to it from a
+    thread other than the one that created it will be staged by
+    the interpreter and written to the view by its timer instead.
+    """
+
+    def __init__(self, interpreter, view):
+        self.interpreter, self.view = interpreter, view
+        self.owner = threading.current_thread().ident
+
+    def __getattr__(self, attribute):
+        return getattr(self.view, attribute)
+
+    def write(self, data):
+        if threading.current_thread().ident != self.owner:
+            return self.interpreter.stage(data)
+
+        # anything staged was written before this, so write that first.
+        self.interpreter.pump()
+        return self.view.write(data)
+
+class dispatcher(object):
+    """
+    This class is called by the editor to execute a method of the
+    interpreter that is stored in the "cache" attribute of a package.
+    The name of the method, its parameters, and its keywords are read
+    from a variable as structured values. This way each action only
+    needs a single command that does not need to be generated, quoted,
+    or compiled for the specific parameters being passed.
+    """
+
+    def __init__(self, package, variable):
+        self.package, self.variable = package, variable
+
+    def __repr__(self):
+        cls = self.__class__
+        return "<{:s} {:s} {:s}>".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__]), self.package.__name__, self.variable)
+
+    def __call__(self):
+        '''Read the method, parameters, and keywords from our variable and execute the method with them.'''
+        method, parameters, keywords, guarded = vim.json(self.variable)
+
+        # if we were guarded, then skip the call if there's no interpreter.
+        if guarded and not hasattr(self.package, 'cache'):
+            return None
+
+        callable = functools.reduce(getattr, method, self.package.cache)
+        return callable(*parameters, **{"{!s}".format(name) : value for name, value in keywords.items()})
+
+class deferred(object):
+    """
+    This class is used to defer the creation of an interpreter until it
+    is actually used. It is instantiated with a callable that returns a
+    started interpreter, and any attribute that is accessed is forwarded
+    to the interpreter after calling it. The methods that only manage an
+    interpreter that has already been started will do nothing until the
+    interpreter exists so that they do not end up starting it, and the
+    methods that should wait for the interpreter can be deferred.
+    """
+
+    def __init__(self, create):
+        self.__create, self.__interpreter, self.__ready = create, None, []
+        self.logger, self.elapsed = logger.getChild('deferred'), 0.0
+
+    def __repr__(self):
+        cls = self.__class__
+        if self.__interpreter is None:
+            return "<{:s} {:s}>".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__]), 'unstarted')
+        return "<{:s} {!r}>".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__]), self.__interpreter)
+
+    @property
+    def started(self):
+        return self.__interpreter is not None
+
+    @property
+    def interpreter(self):
+        '''Return the interpreter after creating and starting it if necessary.'''
+        if self.__interpreter is not None:
+            return self.__interpreter
+
+        started = time.time()
+        self.__interpreter = interpreter = self.__create()
+        self.elapsed = time.time() - started
+        self.logger.info("Started {!r} on first use after {:.3f} seconds.".format(interpreter, self.elapsed))
+
+        # now that we have an interpreter, notify everything that was waiting.
+        ready, self.__ready = self.__ready, []
+        [callable(interpreter) for callable in ready]
+        return interpreter
+
+    def ready(self, callable):
+        '''Call the specified callable with the interpreter as soon as it has been started.'''
+        if self.__interpreter is None:
+            return self.__ready.append(callable)
+        return callable(self.__interpreter)
+
+    def defer(self, method, *parameters, **keywords):
+        '''Call the specified method of the interpreter with the given parameters as soon as it has been started.'''
+        return self.ready(lambda interpreter: getattr(interpreter, method)(*parameters, **keywords))
+
+    def __getattr__(self, attribute):
+        return getattr(self.interpreter, attribute)
+
+    def start(self, *args, **kwargs):
+        '''Start the interpreter, or restart it with the specified parameters if it has already been created.'''
+        if self.__interpreter is None:
+            return True if self.interpreter else False
+        return self.__interpreter.start(*args, **kwargs)
+
+    # these only manage an interpreter that exists, so they do nothing until then.
+    def stop(self):
+        return self.__interpreter.stop() if self.__interpreter is not None else False
+
+    def hide(self, *args, **kwargs):
+        return self.__interpreter.hide(*args, **kwargs) if self.__interpreter is not None else False
+
+    def track(self, event, window, buffer):
+        return self.__interpreter.track(event, window, buffer) if self.__interpreter is not None else None
+
+    def pump(self):
+        return self.__interpreter.pump() if self.__interpreter is not None else 0
+
+    def cancel(self):
+        return getattr(self.__interpreter, 'cancel', lambda: False)() if self.__interpreter is not None else False
+
 # interpreter classes
 class interpreter(object if sys.version_info.major < 3 else abc.ABC):
     __metaclass__ = abc.ABCMeta
@@ -32,6 +384,10 @@ class interpreter(object if sys.version_info.major < 3 else abc.ABC):
         '''Stop the currently running interpreter.'''
         raise NotImplementedError
 
+    def evaluate(self, format, expression, single=False):
+        '''Evaluate the specified expression by sending it to the interpreter after formatting it with `format`.'''
+        return self.communicate(format.format(expression))
+
     # make this thing look kind of like a file
     write = abc.abstractproperty(property())
     writable = abc.abstractproperty(property())
@@ -49,7 +405,11 @@ class interpreter_with_view(interpreter):
     """
 
     def __init__(self):
-        self.__view__ = None
+        self.__view__ = self.timer = None
+
+        # output from other threads is staged here so that it can be
+        # written to the view from the main thread by a timer.
+        self.__staged = process.outputqueue()
 
     def __repr__(self):
         cls, buffer = self.__class__, self.view.buffer if self.view else None
@@ -101,7 +461,8 @@ class interpreter_with_view(interpreter):
             raise vim.error("Unsupported type ({!s}) cannot be assigned to the view for {:s}.".format(number_or_name_or_view.__class__, '.'.join([getattr(cls, '__module__', __name__), cls.__name__])))
 
         # use the buffer to create a view and then return its buffer number.
-        self.__view__ = view = interface.multiview(buffer)
+        lines, bytes = (vim.gvars[name] or 0 for name in ['incpy#ScrollbackLines', 'incpy#ScrollbackBytes'])
+        self.__view__ = view = interface.multiview(buffer, lines=lines, bytes=bytes)
         return view
 
     # window management using the view
@@ -113,6 +474,13 @@ class interpreter_with_view(interpreter):
         elif not isinstance(ratio_or_size, (float, integer_types)):
             raise vim.error("Unexpected type ({!s}) was specified as the ratio or size.".format(ratio_or_size.__class__))
 
+        # if we're showing the window in the current tab and the view already
+        # knows which window is visible, then we can avoid querying the layout.
+        [woptions] = options if options else [{}]
+        visible = None if kwoptions.get('tab', woptions.get('tab', 0)) else self.view.visible
+        if visible is not None:
+            return visible
+
         # figure out the correct window size. if we were given a floating-point
         # number, then this is a percentage of the current dimensions. otherwise,
         # it's just a number of columns or rows depending on the chosen position.
@@ -121,7 +489,6 @@ class interpreter_with_view(interpreter):
 
         # now we need to extract the window options. we support both
         # positional parameters and keyword parameters to build them.
-        [woptions] = options if options else [{}]
         woptions.update(kwoptions)
 
         # last thing to do is to show a window to the buffer using the
@@ -131,7 +498,8 @@ class interpreter_with_view(interpreter):
 
     def hide(self, tab=0):
         '''Hide the interpreter window that is visible on the specified tab.'''
-        windows = {window for window in self.available(tab)}
+        layout = vim.layout()
+        windows = {window for window in self.available(tab, layout=layout)}
 
         # now we need to figure out which window to hide in the tab. there can
         # be more than one open, due to the user being able to manage things
@@ -140,20 +508,77 @@ class interpreter_with_view(interpreter):
 
         # we hide the largest one first which means we'll need to
         # sort our list of managed windows by their dimensions.
-        Fkey_window_area = lambda window: (lambda width, height: width * height)(*vim.window.dimensions(window))
-        ordered = sorted(ours, key=Fkey_window)
+        Fkey_window_area = lambda window: (lambda width, height: width * height)(*layout.dimensions(window))
+        ordered = sorted(ours, key=Fkey_window_area)
 
         # grab the largest window from our sorted list, and proceed to hide it.
         window = next(reversed(ordered), 0)
-        if window and vim.window.exists(window):
+        if window and layout.exists(window):
             return True if self.view.hide(window) > -1 else False
         return False
 
-    def available(self, tab=0):
+    def track(self, event, window, buffer):
+        '''Update the visibility of the view using the autocommand event for the specified window id and buffer number.'''
+        view = self.__view__
+        if view is None or view.__buffer__ is None:
+            return None
+        return view.track(event, window, buffer)
+
+    def available(self, tab=0, layout=None):
         '''Return a list of the windows for the current interpreter on the specified tab.'''
-        available = vim.tab.windows(tab if tab else vim.tab.current())
-        windows = vim.buffer.windows(self.buffer)
-        return [window for window in available & windows]
+        layout = layout or vim.layout()
+        current, _ = layout.current()
+        windows = layout.showing(self.buffer, tab if tab else current)
+        return [window for window in windows]
+
+    # writing output from other threads using a timer
+    def start_pump(self, limit=0, overflow='block'):
+        '''Start the timer that writes staged output at the configured rate and return whether it was started.
+
+        The staged output is limited to `limit` characters (0 is unlimited), and the `overflow`
+        policy of `process.outputqueue` is applied to anything that is staged past that limit.
+        '''
+        rate = vim.gvars['incpy#OutputRate'] or 0
+        if self.timer is None and rate > 0 and vim.has('timers'):
+            self.__staged = process.outputqueue(limit, overflow)
+            self.timer = vim.eval("timer_start({:d}, function('{:s}'), {{'repeat': -1}})".format(max(1, int(1000.0 / rate)), 'incpy#interpreter#pump'))
+        return self.timer is not None
+
+    def stop_pump(self):
+        '''Stop the timer that writes staged output and then write whatever is left.'''
+
+        # release anything that is blocked waiting for the timer to make room,
+        # since the timer can't run while the main thread is waiting on them.
+        self.__staged.close()
+        if self.timer is not None:
+            vim.eval("timer_stop({:d})".format(self.timer))
+            self.timer = None
+        return self.pump()
+
+    def stage(self, data):
+        '''Stage the specified data to be written to the view by the next call to `pump`.'''
+        return self.__staged.put((None, data))
+
+    def pump(self):
+        '''Write any staged data to the view from the main thread and return the number of characters written.'''
+        staged = self.__staged
+
+        # only take what has already been staged, so that a thread that is
+        # staging output as fast as we write it can't keep us here forever.
+        items = []
+        for index in range(staged.qsize()):
+            try:
+                _, data = staged.get(block=False)
+            except process.Asynchronous.QueueEmptyException:
+                break
+            items.append(data)
+
+        if not items:
+            return 0
+
+        data = items[0][:0].join(items)
+        self.view.write(data)
+        return len(data)
 
 class internal(interpreter_with_view):
     """
@@ -164,10 +589,14 @@ class internal(interpreter_with_view):
     class are the same as the parameters for the "exec" keyword.
     """
 
+    # the number of seconds to wait for the worker thread to exit when stopping.
+    grace = 1.0
+
     def __init__(self, *context):
         super(internal, self).__init__()
         self.logger = logger.getChild('internal')
-        self.state = ()
+        self.state, self.worker = (), None
+        self.compiled = codecache()
 
         # validate that we were given a valid number of scopes
         # for executing the python interpreter within.
@@ -196,6 +625,14 @@ class internal(interpreter_with_view):
         '''Start the internal interpreter by attaching it to a new buffer with the specified name.'''
         view = super(internal, self).start(name or vim.gvars['incpy#WindowName'])
 
+        # if we've been asked to use a worker thread, then we need a timer to
+        # write its output from the main thread. without one, we can't use it.
+        if vim.gvars['incpy#InternalThread'] and self.start_pump():
+            self.worker = worker(self.__execute, name="{:s}.worker".format(self.logger.name)).start()
+            view = threadedwriter(self, view)
+        elif vim.gvars['incpy#InternalThread']:
+            self.logger.warning("Unable to execute code with a worker thread due to the editor not having the \"{:s}\" feature or {:s} being disabled.".format('timers', 'g:incpy#OutputRate'))
+
         # after creating the view, back up the current stdin, stdout, and stderr.
         self.state = sys.stdin, sys.stdout, sys.stderr
 
@@ -222,19 +659,25 @@ class internal(interpreter_with_view):
         self.logger.debug("Removing window handler from logger for {:s}.".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__])))
 
         try:
-            iterable = (L for L in self.logger.handlers if isinstance(L, logging.StreamHandler) and L.stream == self.view)
+            iterable = (L for L in self.logger.handlers if isinstance(L, logging.StreamHandler) and getattr(L.stream, 'view', L.stream) == self.view)
             self.logger.removeHandler(next(iterable))
 
         except StopIteration:
             pass
 
+        # if we were using a worker, then cancel whatever it's doing and stop it.
+        if self.worker and not self.worker.stop(self.grace):
+            self.logger.warning("Worker thread for {:s} did not stop in time.".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__])))
+        self.worker = None
+        self.stop_pump()
+
         # notify the user that we're restoring the original state
         self.logger.debug("Restoring sys.stdin, sys.stdout, and sys.stderr from {:s}.".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__])))
         (sys.stdin, sys.stdout, sys.stderr), self.state = self.state, ()
         return True
 
-    def communicate(self, data, silent=False):
-        '''Send the specified data as input to the internal interpreter.'''
+    def communicate(self, data, silent=False, mode='exec'):
+        '''Send the specified data as input to the internal interpreter and compile it using the specified `mode`.'''
         echonewline = vim.gvars['incpy#EchoNewline']
         if vim.gvars['incpy#Echo'] and not silent:
             echoformat = vim.gvars['incpy#EchoFormat']
@@ -242,12 +685,34 @@ class internal(interpreter_with_view):
             iterable = (index for index, item in enumerate(lines[::-1]) if item.strip())
             trimmed = next(iterable, 0)
             echo = '\n'.join(map(echoformat.format, lines[:-trimmed] if trimmed > 0 else lines))
+            self.pump()
             self.write(echonewline.format(echo))
 
-        # extract the scopes that we were instantiated with
-        # and execute the code we were given within them.
+        # compile the code we were given and then execute it. if we have a
+        # worker, then we hand it off and return the job so that it can be
+        # waited on or cancelled.
+        codes = self.compiled(data, mode)
+        if self.worker:
+            return self.worker.submit(codes, vim.gvars['incpy#InternalTimeout'] or 0)
+
+        for code in codes:
+            self.__execute(code)
+        return
+
+    def evaluate(self, format, expression, single=False):
+        '''Evaluate the specified expression, compiling it in the "single" mode so that its result is displayed instead of formatting it if `single` is true.'''
+        if single:
+            return self.communicate("{}\n".format(expression), mode='single')
+        return super(internal, self).evaluate(format, expression)
+
+    def __execute(self, code):
+        '''Execute the specified `code` within the scopes that we were instantiated with.'''
         globals, locals, closure = (self.__workspace__ + 3 * [None])[:3]
-        exec("exec(data, globals, locals{:s})".format(', closure=closure' if sys.version_info.major >= 3 and sys.version_info.minor >= 11 else ''))
+        return execute(code, globals, locals, closure)
+
+    def cancel(self):
+        '''Cancel the code that is currently being executed by the worker thread.'''
+        return self.worker.cancel() if self.worker else False
 
 class external(interpreter_with_view):
     """
@@ -275,8 +740,14 @@ class external(interpreter_with_view):
         '''Start the process associated with the external interpreter in a buffer with the specified name.'''
         cls, view = self.__class__, super(external, self).start(name or vim.gvars['incpy#WindowName'])
 
+        # if the editor has timers, then stage the output so that it can be
+        # written by the timer at the configured rate instead of a thread. the
+        # staged output uses the same budget as the output queue of the process.
+        options = self.command_options
+        pumped = self.start_pump(options.get('queue_size', 0x1000000), options.get('queue_overflow', 'block'))
+
         self.logger.debug("Spawning process for {:s} in buffer {:d} with command: {:s}.".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__]), self.buffer, self.command))
-        self.instance = instance = process.spawn(view.write, self.command, **self.command_options)
+        self.instance = instance = process.spawn(self.stage if pumped else view.write, self.command, **self.command_options)
         self.logger.info("Process {:d} ({:#x}) has been started for {:s}.".format(self.instance.id, self.instance.id, '.'.join([getattr(cls, '__module__', __name__), cls.__name__])))
 
         # FIXME: worth verifying that the process was started successfully.
@@ -294,8 +765,13 @@ class external(interpreter_with_view):
             self.logger.fatal("Refusing to stop process for {:s} which has already been terminated.".format('.'.join([getattr(cls, '__module__', __name__), cls.__name__]), self.instance))
             return False
 
+        # stop our timer first so that the process isn't left blocked on the
+        # staged output while we wait for it to stop. once the process is gone,
+        # we can write whatever it staged while it was being stopped.
         self.logger.info("Killing process {:d} ({:#x}) started by {:s}.".format(self.instance.id, self.instance.id, '.'.join([getattr(cls, '__module__', __name__), cls.__name__])))
+        self.stop_pump()
         self.instance.stop()
+        self.pump()
         return True
 
     def communicate(self, data, silent=False):
@@ -307,6 +783,7 @@ class external(interpreter_with_view):
             iterable = (index for index, item in enumerate(lines[::-1]) if item.strip())
             trimmed = next(iterable, 0)
             echo = '\n'.join(map(echoformat.format, lines[:-trimmed] if trimmed > 0 else lines))
+            self.pump()
             self.write(echonewline.format(echo))
         self.instance.write(data)
 
@@ -112,13 +112,82 @@ class python_import_machinery(object):
 
     # These next ones map the same functions to their Py3 versions.
     else:
-        import importlib, importlib.machinery, importlib.util
+        import importlib, importlib.abc, importlib.machinery, importlib.util
         new_module, find_module, load_module, load_source = new_module_py3, find_module_py3, load_module_py3, load_source_py3
         module_spec, module_spec_from_file = module_spec_py3, module_spec_from_file_py3
 
+class bytecode_cache(object):
+    """
+    This class is responsible for caching the code that is compiled
+    from the files of the plugin within a directory for the user. The
+    files are written in the same format as the ".pyc" files that are
+    written by the "importlib" module, and are validated using the
+    modification time and size of their source before being used.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, source):
+        import hashlib
+        location = os.path.dirname(os.path.abspath(source)).encode('utf-8', 'surrogateescape')
+        identifier = hashlib.sha1(location).hexdigest()[:16]
+        cached = python_import_machinery.importlib.util.cache_from_source(source)
+        return os.path.join(self.directory, identifier, os.path.basename(cached))
+
+    def header(self, stat):
+        import struct
+        magic = python_import_machinery.importlib.util.MAGIC_NUMBER
+        flags = struct.pack('<I', 0) if sys.version_info[:2] >= (3, 7) else b''
+        return magic + flags + struct.pack('<II', int(stat.st_mtime) & 0xFFFFFFFF, stat.st_size & 0xFFFFFFFF)
+
+    def load(self, source, stat):
+        import marshal
+        header, path = self.header(stat), self.path(source)
+        try:
+            with builtins.open(path, 'rb') as infile:
+                data = infile.read()
+        except (IOError, OSError):
+            return None
+        if data[:len(header)] != header:
+            return None
+
+        # if the file was truncated or corrupted, then treat it as a miss so that it gets rewritten.
+        try:
+            code = marshal.loads(data[len(header):])
+        except (EOFError, ValueError, TypeError):
+            return None
+        return code if isinstance(code, type(self.load.__code__)) else None
+
+    def store(self, source, stat, code):
+        import marshal, tempfile
+        path = self.path(source)
+        try:
+            directory = os.path.dirname(path)
+            os.path.isdir(directory) or os.makedirs(directory)
+            fd, temporary = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'wb') as outfile:
+                outfile.write(self.header(stat) + marshal.dumps(code))
+            os.replace(temporary, path)
+        except (IOError, OSError):
+            return False
+        return True
+
+    def compile(self, source):
+        stat = os.stat(source)
+        code = self.load(source, stat)
+        if code is not None:
+            return code
+
+        with builtins.open(source, 'rb') as infile:
+            data = infile.read()
+        code = python_import_machinery.importlib.abc.InspectLoader.source_to_code(data, source)
+        self.store(source, stat, code)
+        return code
+
 class vim_plugin_support_loader(object):
-    def __init__(self, name, components, path):
+    def __init__(self, name, components, path, cache=None):
         self._name, self._components, self._path = name, components, path
+        self._cache = cache
     def get_spec(self):
         PY_SOURCE = 1
         _, ext = os.path.splitext(self._path)
@@ -126,6 +195,10 @@ class vim_plugin_support_loader(object):
     def create_module(self, spec):
         return None
     def exec_module(self, module):
+        if self._cache is not None:
+            exec_(self._cache.compile(self._path), module.__dict__, module.__dict__)
+            return module
+
         with builtins.open(self._path, 'rt') as infile:
             exec_(infile.read(), module.__dict__, module.__dict__)
         return module
@@ -149,9 +222,10 @@ class vim_plugin_support_loader_py2(vim_plugin_support_loader):
         return module
 
 class vim_plugin_support_finder(object):
-    def __init__(self, path, mapping):
+    def __init__(self, path, mapping, cache=None):
         self._runtime_path = path
         self._mapping = mapping
+        self._cache = cache
 
     # Py2
     def find_module(self, fullname, path=None):
@@ -185,7 +259,7 @@ class vim_plugin_support_finder(object):
 
             package, suffix = os.path.splitext(fp)
             attributes = {'is_package': True} if os.path.isdir(package) else {}
-            loader = vim_plugin_support_loader(fullname, [], fp)
+            loader = vim_plugin_support_loader(fullname, [], fp, self._cache)
             return python_import_machinery.module_spec(fullname, loader, **attributes)
 
         elif module in self._mapping:
@@ -197,7 +271,7 @@ class vim_plugin_support_finder(object):
 
             dp = os.path.dirname(fp)
             attributes = {'is_package': True} if os.path.isdir(dp) else {}
-            loader = vim_plugin_support_loader(module, components, fp)
+            loader = vim_plugin_support_loader(module, components, fp, self._cache)
             return python_import_machinery.module_spec(fullname, loader, **attributes)
 
         return None
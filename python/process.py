@@ -1,5 +1,5 @@
 import sys, functools, itertools, operator
-import os, codecs, weakref, time, itertools, shlex
+import os, codecs, weakref, time, itertools, shlex, collections, tempfile
 
 from . import integer_types, string_types, reraise, logger
 logger = logger.getChild(__name__)
@@ -48,21 +48,34 @@ try:
         ident = name = property(fget=setName, fset=setName)
 
     class Asynchronous:
-        import gevent.queue, gevent.event, gevent.subprocess
-        Thread, Queue, Event = map(staticmethod, (Thread, gevent.queue.Queue, gevent.event.Event))
+        import gevent.queue, gevent.event, gevent.lock, gevent.subprocess
+        Thread, Queue, Event, Lock = map(staticmethod, (Thread, gevent.queue.Queue, gevent.event.Event, gevent.lock.Semaphore))
+        QueueEmptyException = gevent.queue.Empty
         spawn, spawn_options = map(staticmethod, (gevent.subprocess.Popen, gevent.subprocess))
 
+        # Older versions of gevent do not raise an exception when waiting times out
+        try:
+            from gevent.subprocess import TimeoutExpired
+        except ImportError:
+            class TimeoutExpired(Exception): pass
+
 except ImportError:
     HAS_GEVENT = 0
     logger.info('the gevent module was not found within the current environment. using the thread-based variation of spawn.')
 
     class Asynchronous:
         import threading
-        Thread, Event = map(staticmethod, (threading.Thread, threading.Event))
+        Thread, Event, Lock = map(staticmethod, (threading.Thread, threading.Event, threading.Lock))
 
         import subprocess
         spawn, spawn_options = map(staticmethod, (subprocess.Popen, subprocess))
 
+        # Python2's subprocess does not support waiting with a timeout
+        try:
+            from subprocess import TimeoutExpired
+        except ImportError:
+            class TimeoutExpired(Exception): pass
+
         # Try importing with Python3's name first
         try:
             import queue as Queue
@@ -73,6 +86,695 @@ except ImportError:
 
         Queue, QueueEmptyException = map(staticmethod, (Queue.Queue, Queue.Empty))
 
+### shared i/o loop for monitoring the pipes of multiple processes
+
+class multiplexer(object):
+    """Monitors the pipes belonging to any number of processes from a single thread using the `selectors` module.
+
+    Each pipe is registered as a channel along with an incremental decoder and a callable.
+    Whenever a pipe is readable, a block is read from it, decoded, and then handed to the
+    callable for the channel. Once all of the readable channels have been handled, the
+    dispatcher that owns each channel is called to process the work that was produced.
+    The number of threads is constant regardless of the number of monitored processes.
+    """
+    import threading
+
+    # selectors can only poll pipes on posix, and greenlets have their own hub.
+    try:
+        import selectors
+        supported = os.name != 'nt' and not HAS_GEVENT
+
+    except ImportError:
+        supported = False
+    __instance__, __instance_lock__ = None, threading.Lock()
+
+    @classmethod
+    def default(cls):
+        '''Return the multiplexer that is shared by every process, creating it if necessary.'''
+        with cls.__instance_lock__:
+            if cls.__instance__ is None:
+                cls.__instance__ = cls()
+            return cls.__instance__
+
+    class _channel(object):
+        """A pipe that is being monitored by the multiplexer. This pretends to be a thread so that it can be managed like one."""
+        def __init__(self, loop, send, pipe, decoder, blocksize=0x10000, owner=None, finished=None, name=None):
+            self.loop, self.pipe, self.owner, self.daemon = loop, pipe, owner, True
+            self.name = name or "channel_{:x}".format(id(self))
+            self.__send, self.__decoder, self.__notify = send, decoder(), finished
+            self.__buffer = bytearray(blocksize)
+            self.__view = memoryview(self.__buffer)
+            self.__finished = multiplexer.threading.Event()
+
+        def start(self):
+            return self.loop.register(self)
+        def cancel(self):
+            return self.loop.unregister(self)
+
+        def join(self, timeout=None):
+            return self.__finished.wait(timeout)
+        is_alive = isAlive = lambda self: not self.__finished.is_set()
+
+        def fileno(self):
+            return self.pipe.fileno()
+
+        def read(self):
+            '''Read and dispatch whatever is available from the pipe. Returns false if the end of the pipe was reached.'''
+            try:
+                count = self.pipe.readinto(self.__buffer) or 0
+            except (OSError, ValueError):
+                count = 0
+
+            result = self.__decoder.decode(self.__view[:count], not count)
+            result and self.__send(result)
+            return count > 0
+
+        def finish(self):
+            self.__finished.set()
+            self.__notify and self.__notify()
+
+    class _dispatcher(object):
+        """A callable that is executed by the multiplexer whenever any of its channels have been read from."""
+        def __init__(self, loop, callable, name=None):
+            self.loop, self.callable, self.daemon = loop, callable, True
+            self.name = name or "dispatcher_{:x}".format(id(self))
+            self.__lock = multiplexer.threading.Lock()
+            self.__finished = multiplexer.threading.Event()
+            self.__finished.set()
+
+        def start(self):
+            self.__finished.clear()
+        def notify(self):
+            return self.loop.notify(self)
+
+        def cancel(self):
+            '''Stop dispatching, waiting for the dispatcher to complete if it is currently being executed.'''
+            if self.loop.current():
+                return self.__finished.set()
+            with self.__lock:
+                self.__finished.set()
+            return
+
+        def join(self, timeout=None):
+            return self.__finished.wait(timeout)
+        is_alive = isAlive = lambda self: self.loop.running and not self.__finished.is_set()
+
+        def __call__(self):
+            with self.__lock:
+                if not self.__finished.is_set():
+                    self.callable()
+                return
+
+    def __init__(self):
+        self.selector = self.selectors.DefaultSelector()
+        self.thread, self.lock = None, self.threading.Lock()
+        self.pending, self.notified = [], set()
+
+        # create a pipe that we can write to in order to wake up the loop.
+        self.__wakeup = os.pipe()
+        [ self.__nonblocking(fd) for fd in self.__wakeup ]
+        self.selector.register(self.__wakeup[0], self.selectors.EVENT_READ, None)
+
+    running = property(fget=lambda self: self.thread is not None and self.thread.is_alive())
+    channels = property(fget=lambda self: [key.data for key in self.selector.get_map().values() if key.data is not None])
+
+    def current(self):
+        '''Return whether the caller is executing within the thread for the multiplexer.'''
+        return self.thread is not None and self.thread.ident == self.threading.current_thread().ident
+
+    def channel(self, send, pipe, **options):
+        '''Return a new channel that dispatches anything decoded from `pipe` to `send`.'''
+        return self._channel(self, send, pipe, **options)
+
+    def dispatcher(self, callable, **options):
+        '''Return a new dispatcher that executes `callable` after any of its channels have been read from.'''
+        return self._dispatcher(self, callable, **options)
+
+    def register(self, channel):
+        '''Start monitoring the pipe for the specified `channel`.'''
+        with self.lock:
+            self.pending.append((True, channel))
+            if not self.running:
+                self.thread = thread = self.threading.Thread(target=self.__loop, name="multiplexer-{:x}".format(id(self)))
+                thread.daemon = True
+                thread.start()
+            self.__wake()
+        return channel
+
+    def unregister(self, channel):
+        '''Stop monitoring the pipe for the specified `channel` and wait until the loop has released it.'''
+        if self.current():
+            return self.__remove(channel)
+
+        with self.lock:
+            self.pending.append((False, channel))
+            self.__wake()
+        return channel.join()
+
+    def notify(self, dispatcher):
+        '''Ask the loop to execute the specified `dispatcher` as soon as possible.'''
+        with self.lock:
+            self.notified.add(dispatcher)
+            self.__wake()
+        return
+
+    @staticmethod
+    def __nonblocking(fd):
+        '''Prevent reads and writes for the specified file descriptor from blocking.'''
+        if hasattr(os, 'set_blocking'):
+            return os.set_blocking(fd, False)
+
+        import fcntl
+        flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+        return fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+    def __wake(self):
+        try:
+            os.write(self.__wakeup[1], b'\0')
+        except (IOError, OSError):
+            pass
+        return
+
+    def __remove(self, channel):
+        try:
+            self.selector.unregister(channel)
+        except (KeyError, ValueError):
+            pass
+        channel.finish()
+
+    def __update(self):
+        '''Apply any pending registrations and return the dispatchers that were notified. **used internally**'''
+        with self.lock:
+            pending, self.pending = self.pending, []
+            notified, self.notified = self.notified, set()
+
+        for add, channel in pending:
+            if not add:
+                self.__remove(channel)
+                continue
+
+            try:
+                self.selector.register(channel, self.selectors.EVENT_READ, channel)
+            except (KeyError, ValueError, OSError):
+                logger.warning("{:s}.__update : Unable to monitor the pipe for channel {:s}.".format('.'.join((__name__, self.__class__.__name__)), channel.name), exc_info=True)
+                channel.finish()
+            continue
+        return notified
+
+    def __loop(self):
+        while True:
+            owners = self.__update()
+
+            # wait for any of our pipes to be readable. if it's our wakeup pipe,
+            # then clear it so that we can update our registrations next time.
+            for key, mask in self.selector.select():
+                channel = key.data
+                if channel is None:
+                    try:
+                        while os.read(self.__wakeup[0], 0x100): pass
+                    except (IOError, OSError):
+                        pass
+                    continue
+
+                # read from the channel, removing it if its pipe has been closed.
+                if not channel.read():
+                    self.__remove(channel)
+                channel.owner is None or owners.add(channel.owner)
+
+            # now we can process the work for each dispatcher that was affected.
+            for dispatcher in owners:
+                try:
+                    dispatcher()
+                except Exception:
+                    logger.warning("{:s}.__loop : Exception raised while executing dispatcher {:s}.".format('.'.join((__name__, self.__class__.__name__)), dispatcher.name), exc_info=True)
+                continue
+            continue
+        return
+
+### asyncio-based event loop for spawning and monitoring processes
+
+class eventloop(object):
+    """Spawns and monitors processes using an `asyncio` event loop that runs within a dedicated thread.
+
+    This is an alternative to the `Asynchronous` namespace that uses the stream readers
+    from `asyncio.create_subprocess_exec` to read from each pipe without blocking. The
+    object returned by `eventloop.subprocess` mimics the interface of `subprocess.Popen`,
+    and its channels and dispatchers are compatible with the ones from the multiplexer.
+    Callbacks are used instead of coroutines so that this module remains parseable
+    by older versions of Python that do not support the "async" or "await" keywords.
+    """
+    try:
+        import asyncio, concurrent.futures, signal, threading
+        from subprocess import TimeoutExpired
+        supported = not HAS_GEVENT
+
+    except ImportError:
+        supported = False
+
+    __instance__, __instance_lock__ = None, multiplexer.threading.Lock()
+
+    @classmethod
+    def default(cls):
+        '''Return the event loop that is shared by every process, creating it if necessary.'''
+        with cls.__instance_lock__:
+            if cls.__instance__ is None:
+                cls.__instance__ = cls()
+            return cls.__instance__
+
+    class _reader(object):
+        """A wrapper around an `asyncio.StreamReader` that can be closed like a pipe."""
+        def __init__(self, stream):
+            self.stream, self.closed = stream, False
+        def read(self, amount=-1):
+            return self.stream.read(amount)
+        def close(self):
+            self.closed = True
+
+    class _writer(object):
+        """A wrapper around an `asyncio.StreamWriter` that can be written to from any thread."""
+        def __init__(self, loop, stream):
+            self.loop, self.stream, self.closed = loop, stream, False
+        def write(self, data):
+            self.loop.call(self.stream.write, data)
+            return len(data)
+        def close(self):
+            if not self.closed:
+                self.closed = True
+                self.loop.call(self.stream.close)
+            return
+
+    class _program(object):
+        """A wrapper around an `asyncio.subprocess.Process` that mimics the interface of `subprocess.Popen`."""
+        def __init__(self, loop, args, program):
+            self.loop, self.args, self.__program = loop, args, program
+            self.pid = program.pid
+            self.stdin = eventloop._writer(loop, program.stdin) if program.stdin else None
+            self.stdout = eventloop._reader(program.stdout) if program.stdout else None
+            self.stderr = eventloop._reader(program.stderr) if program.stderr else None
+
+        returncode = property(fget=lambda self: self.__program.returncode)
+
+        def poll(self):
+            return self.__program.returncode
+
+        def wait(self, timeout=None):
+            if self.loop.current():
+                if self.__program.returncode is None:
+                    raise eventloop.TimeoutExpired(self.args, timeout)
+                return self.__program.returncode
+
+            try:
+                return self.loop.run(self.__program.wait(), timeout)
+            except eventloop.concurrent.futures.TimeoutError:
+                raise eventloop.TimeoutExpired(self.args, timeout)
+            return
+
+        # like `subprocess.Popen`, signalling a process that has already
+        # terminated is silently ignored instead of raising an exception.
+        def send_signal(self, signal):
+            try:
+                return self.loop.call(self.__program.send_signal, signal) if self.__program.returncode is None else None
+            except ProcessLookupError:
+                pass
+            return
+        def terminate(self):
+            return self.send_signal(eventloop.signal.SIGTERM)
+        def kill(self):
+            return self.send_signal(getattr(eventloop.signal, 'SIGKILL', eventloop.signal.SIGTERM))
+
+    class _channel(object):
+        """A stream that is being read by the event loop. This pretends to be a thread so that it can be managed like one."""
+        def __init__(self, loop, send, pipe, decoder, blocksize=0x10000, owner=None, finished=None, name=None):
+            self.loop, self.pipe, self.owner, self.daemon = loop, pipe, owner, True
+            self.name = name or "channel_{:x}".format(id(self))
+            self.__send, self.__decoder, self.__blocksize, self.__notify = send, decoder(), blocksize, finished
+            self.__future, self.__finished = None, eventloop.threading.Event()
+
+        def start(self):
+            self.loop.call(self.__schedule)
+            return self
+
+        def cancel(self):
+            self.loop.call(self.__cancel)
+            return self.join()
+
+        def join(self, timeout=None):
+            return self.__finished.wait(timeout)
+        is_alive = isAlive = lambda self: not self.__finished.is_set()
+
+        def __schedule(self):
+            self.__future = future = self.loop.loop.create_task(self.pipe.read(self.__blocksize))
+            future.add_done_callback(self.__ready)
+
+        def __cancel(self):
+            self.__future and self.__future.cancel()
+            self.__finish()
+
+        def __finish(self):
+            self.__finished.set()
+            self.__notify and self.__notify()
+
+        def __ready(self, future):
+            if future.cancelled() or self.__finished.is_set():
+                return self.__finish()
+
+            try:
+                data = future.result()
+            except Exception:
+                data = b''
+
+            # decode whatever we read and then hand it off to our owner.
+            result = self.__decoder.decode(data, not data)
+            result and self.__send(result)
+            try:
+                self.owner is None or self.owner()
+            except Exception:
+                logger.warning("{:s}.__ready : Exception raised while executing dispatcher {:s}.".format('.'.join((__name__, self.__class__.__name__)), self.owner.name), exc_info=True)
+
+            # if we reached the end of the stream, then we're done.
+            return self.__schedule() if data else self.__finish()
+
+    _dispatcher = multiplexer._dispatcher
+
+    def __init__(self):
+        self.loop = loop = self.asyncio.new_event_loop()
+        self.thread = thread = self.threading.Thread(target=self.__run, name="eventloop-{:x}".format(id(self)), args=(loop,))
+        thread.daemon = True
+        thread.start()
+
+    running = property(fget=lambda self: self.thread.is_alive() and self.loop.is_running())
+
+    def __run(self, loop):
+        self.asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def current(self):
+        '''Return whether the caller is executing within the thread for the event loop.'''
+        return self.thread.ident == self.threading.current_thread().ident
+
+    def call(self, callable, *args):
+        '''Execute `callable` with the given `args` from within the event loop and return its result.'''
+        if self.current():
+            return callable(*args)
+
+        future = self.concurrent.futures.Future()
+        def execute(future, callable, args):
+            try:
+                future.set_result(callable(*args))
+            except BaseException as E:
+                future.set_exception(E)
+            return
+        self.loop.call_soon_threadsafe(execute, future, callable, args)
+        return future.result()
+
+    def run(self, coroutine, timeout=None):
+        '''Run the specified `coroutine` within the event loop and return its result.'''
+        future = self.asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        return future.result(timeout)
+
+    def channel(self, send, pipe, **options):
+        '''Return a new channel that dispatches anything decoded from the stream in `pipe` to `send`.'''
+        return self._channel(self, send, pipe, **options)
+
+    def dispatcher(self, callable, **options):
+        '''Return a new dispatcher that executes `callable` after any of its channels have been read from.'''
+        return self._dispatcher(self, callable, **options)
+
+    def notify(self, dispatcher):
+        '''Ask the event loop to execute the specified `dispatcher` as soon as possible.'''
+        self.loop.call_soon_threadsafe(dispatcher)
+
+    def subprocess(self, program, cwd, environment, joined, shell=False):
+        '''Create a subprocess using `asyncio` and return an object that mimics `subprocess.Popen`.'''
+        PIPE, STDOUT = self.asyncio.subprocess.PIPE, self.asyncio.subprocess.STDOUT
+        options = dict(stdin=PIPE, stdout=PIPE, stderr=STDOUT if joined else PIPE, cwd=cwd, env=environment)
+        options['close_fds'] = os.name != 'nt'
+
+        ## split our arguments out if necessary
+        command = shlex.split(program) if isinstance(program, string_types) else program[:]
+
+        ## hand it off to the event loop to create the process
+        try:
+            if shell:
+                coroutine = self.asyncio.create_subprocess_shell(' '.join(map(shlex.quote, command)), **options)
+            else:
+                coroutine = self.asyncio.create_subprocess_exec(*command, **options)
+            program = self.run(coroutine)
+        except OSError: raise OSError("Unable to execute command: {!r}".format(command))
+        return self._program(self, command, program)
+
+### byte-budgeted queue for the output of a process
+
+class outputqueue(object):
+    """A queue of (callable, data) tasks whose total size is limited to a budget.
+
+    The size of a task is the length of its data, and a `limit` of 0 leaves the queue
+    unbounded. Whenever the budget is exceeded, the `overflow` policy determines what
+    happens to the task being added:
+
+    'block' -- block the producer until the consumer has made room. this backpressures
+               the program through its pipe. a non-blocking put is always admitted.
+    'drop'  -- discard the oldest queued output until the task fits.
+    'spill' -- write the task to a temporary file that is read back when it is consumed.
+
+    Tasks that are not a (callable, data) tuple (such as the sentinel) are always admitted.
+
+    properties:
+    used -- number of characters that are currently queued in memory
+    dropped -- number of characters that have been discarded
+    spilled -- number of characters that have been written to the temporary file
+    blocked -- number of times that a producer has had to wait for room
+    """
+    policies = {'block', 'drop', 'spill'}
+
+    class _record(tuple):
+        """The location of a task that was spilled to the temporary file."""
+
+    def __init__(self, limit=0, overflow='block'):
+        if overflow not in self.policies:
+            raise ValueError("Unsupported overflow policy ({!r}) was specified.".format(overflow))
+        self.limit, self.overflow = max(0, limit), overflow
+        self.used = self.dropped = self.spilled = self.blocked = 0
+
+        self.__items, self.__closed = collections.deque(), False
+        self.__lock, self.__available, self.__room = Asynchronous.Lock(), Asynchronous.Event(), Asynchronous.Event()
+        self.__spill, self.__spilled = None, 0
+
+    def __repr__(self):
+        return "<{:s} used:{:d}/{:d} overflow:{:s} dropped:{:d} spilled:{:d} blocked:{:d}>".format(self.__class__.__name__, self.used, self.limit, self.overflow, self.dropped, self.spilled, self.blocked)
+
+    @staticmethod
+    def size(item):
+        '''Return the number of characters that `item` is charged against the budget.'''
+        return len(item[1]) if isinstance(item, tuple) and len(item) == 2 and hasattr(item[1], '__len__') else 0
+
+    def qsize(self):
+        return len(self.__items)
+    def empty(self):
+        return not self.__items
+    def full(self):
+        return self.limit > 0 and self.used >= self.limit
+
+    def close(self):
+        '''Stop applying backpressure so that any producers that are blocked are released.'''
+        with self.__lock:
+            self.__closed = True
+            self.__room.set()
+        return
+
+    def put(self, item, block=True):
+        '''Add `item` to the queue, applying the overflow policy if it exceeds the budget.'''
+        size = self.size(item)
+        while True:
+            with self.__lock:
+                fits = self.__closed or not (self.limit and size and self.used and self.used + size > self.limit)
+                if fits or not block or self.overflow != 'block':
+                    return self.__append(item, size, fits)
+                self.__room.clear()
+                self.blocked += 1
+            self.__room.wait()
+        return
+
+    def __append(self, item, size, fits):
+        '''Append `item` to the queue while holding the lock. **used internally**'''
+        if not fits and self.overflow == 'drop':
+            self.__drop(self.used + size - self.limit)
+
+        elif not fits and self.overflow == 'spill':
+            item, size = self.__write(item), 0
+
+        self.__items.append(item)
+        self.used += size
+        self.__available.set()
+
+    def __drop(self, count):
+        '''Discard the oldest queued output until at least `count` characters have been released. **used internally**'''
+        kept, released = [], 0
+        while self.__items and released < count:
+            item = self.__items.popleft()
+            size = self.size(item)
+            if size:
+                released, self.dropped = released + size, self.dropped + size
+            else:
+                kept.append(item)
+            continue
+        self.__items.extendleft(reversed(kept))
+        self.used -= released
+
+    def __write(self, item):
+        '''Write the data for `item` to the temporary file and return a record for reading it back. **used internally**'''
+        emit, data = item
+        if self.__spill is None:
+            self.__spill = tempfile.TemporaryFile()
+        encoded = data if isinstance(data, bytes) else data.encode('utf-8')
+
+        self.__spill.seek(0, os.SEEK_END)
+        offset = self.__spill.tell()
+        self.__spill.write(encoded)
+        self.spilled, self.__spilled = self.spilled + len(data), self.__spilled + 1
+        return outputqueue._record([emit, offset, len(encoded), isinstance(data, bytes)])
+
+    def __read(self, record):
+        '''Read the task that was spilled at `record` back from the temporary file. **used internally**'''
+        emit, offset, length, binary = record
+        self.__spill.seek(offset)
+        encoded = self.__spill.read(length)
+
+        # once nothing else has been spilled, we can reuse the file from the beginning.
+        self.__spilled -= 1
+        self.__spilled or self.__spill.truncate(0)
+        return emit, encoded if binary else encoded.decode('utf-8')
+
+    def get(self, block=True, timeout=None):
+        '''Remove and return the oldest item, waiting up to `timeout` seconds for one if `block` is true.'''
+        expiry = None if timeout is None else time.time() + timeout
+        while True:
+            with self.__lock:
+                if self.__items:
+                    item = self.__items.popleft()
+                    if isinstance(item, outputqueue._record):
+                        return self.__read(item)
+                    self.used -= self.size(item)
+                    self.__room.set()
+                    return item
+                self.__available.clear()
+
+            remaining = None if expiry is None else expiry - time.time()
+            if not block or (remaining is not None and remaining <= 0):
+                raise Asynchronous.QueueEmptyException()
+            self.__available.wait(remaining)
+        return
+
+### queue for writing to the input of a process without blocking
+
+class inputqueue(object):
+    """A queue of data that is written to the pipe for the input of a program from a dedicated thread.
+
+    Writing directly to the pipe blocks the caller whenever the program is busy and the
+    pipe is full. Instead, `put` queues the data and returns immediately, and the thread
+    writes it to the pipe in the order that it was queued. After `close`, the thread
+    finishes writing whatever is left and then closes the pipe. If the pipe fails, then
+    the error is saved in `exception` and any data that is still queued is discarded.
+
+    properties:
+    pending -- number of bytes that have been queued but not yet written
+    written -- number of bytes that have been written to the pipe
+    closed -- whether the queue has been closed and will no longer accept data
+    """
+
+    def __init__(self, pipe, daemon=True, name=None):
+        self.pipe, self.exception = pipe, None
+        self.pending = self.written = 0
+
+        self.__items, self.__closed = collections.deque(), False
+        self.__lock, self.__available, self.__drained = Asynchronous.Lock(), Asynchronous.Event(), Asynchronous.Event()
+        self.__drained.set()
+
+        self.thread = thread = Asynchronous.Thread(target=self.__loop, name=name or "input-{:x}".format(id(self)))
+        thread.daemon = daemon
+
+    def __repr__(self):
+        return "<{:s} pending:{:d} written:{:d}{:s}>".format(self.__class__.__name__, self.pending, self.written, ' closed' if self.__closed else '')
+
+    closed = property(fget=lambda self: self.__closed)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def join(self, timeout=None):
+        return self.thread.join(timeout)
+
+    def put(self, data):
+        '''Queue `data` to be written to the pipe and return the number of bytes that were queued.'''
+        with self.__lock:
+            if self.__closed:
+                raise IOError("Unable to write to a closed pipe{:s}.".format(" ({!s})".format(self.exception) if self.exception else ''))
+            elif not len(data):
+                return 0
+            self.__items.append(data)
+            self.pending += len(data)
+            self.__drained.clear()
+            self.__available.set()
+        return len(data)
+
+    def drain(self, timeout=None):
+        '''Block until everything that was queued has been written or `timeout` seconds have elapsed, and return whether it was.'''
+        return True if self.__drained.wait(timeout) else self.__drained.is_set()
+
+    def close(self):
+        '''Stop accepting data so that the pipe is closed once everything that was queued has been written.'''
+        with self.__lock:
+            self.__closed = True
+            self.__available.set()
+        return
+
+    def __write(self, data):
+        '''Write all of `data` to the pipe. **used internally**'''
+        view = memoryview(data)
+        while len(view):
+            count = self.pipe.write(view)
+            view = view[len(view) if count is None else count:]
+        return len(data)
+
+    def __loop(self):
+        '''Write each item from the queue to the pipe until it has been closed. **used internally**'''
+        while True:
+            with self.__lock:
+                data = self.__items.popleft() if self.__items else None
+                if data is None and self.__closed:
+                    break
+                elif data is None:
+                    self.__available.clear()
+
+            if data is None:
+                self.__available.wait()
+                continue
+
+            # if we couldn't write to the pipe, then there's no point in keeping
+            # anything else that was queued. so we save the error and discard it.
+            try:
+                self.__write(data)
+            except (OSError, IOError, ValueError) as E:
+                with self.__lock:
+                    self.exception, self.__closed = E, True
+                    self.__items.clear()
+                    self.pending = 0
+                break
+
+            with self.__lock:
+                self.pending, self.written = self.pending - len(data), self.written + len(data)
+                self.pending or self.__drained.set()
+            continue
+
+        # everything has been written (or discarded), so close the pipe.
+        self.__drained.set()
+        try:
+            self.pipe.closed or self.pipe.close()
+        except (OSError, IOError, ValueError):
+            pass
+        return
+
 ### asynchronous process monitor
 
 # monitoring an external process' i/o via threads/queues
@@ -90,12 +792,16 @@ class process(object):
     running -- returns true if process is running and monitor threads are workingj
     working -- returns true if monitor threads are working
     threads -- list of threads that are monitoring subprocess pipes
-    taskQueue -- Asynchronous.Queue() instance that contains work to be processed
+    taskQueue -- outputqueue() instance that contains work to be processed
+    inputQueue -- inputqueue() instance that writes to the program's stdin from its own thread
+    pending -- number of bytes written to the program that are still waiting to be sent to its stdin
     exceptionQueue -- Asynchronous.Queue() instance containing exceptions generated during processing
     (process.stdout, process.stderr)<Queue> -- Queues containing output from the spawned process.
     """
 
     program = None              # Asynchronous.spawn result
+    supported = True            # the thread engine is always available
+    interval = 0.1              # the longest that process.wait will go without checking the program
     id = property(fget=lambda self: self.program and self.program.pid or -1)
     running = property(fget=lambda self: False if self.program is None else self.program.poll() is None)
     working = property(fget=lambda self: self.running and not self.eventWorking.is_set())
@@ -103,6 +809,8 @@ class process(object):
     updater = property(fget=lambda self: self.__updater__)
 
     taskQueue = property(fget=lambda self: self.__taskQueue)
+    inputQueue = property(fget=lambda self: self.__inputQueue)
+    pending = property(fget=lambda self: self.__inputQueue.pending if self.__inputQueue else 0)
     exceptionQueue = property(fget=lambda self: self.__exceptionQueue)
 
     encoding = property(fget=lambda self: self.codec.name)
@@ -117,6 +825,13 @@ class process(object):
         show<bool> = False -- if within a windowed environment, open up a console for the process.
         paused<bool> = False -- if enabled, then don't start the process until .start() is called
         timeout<float> = -1 -- if positive, then raise a Asynchronous.Empty exception at the specified interval.
+        blocksize<int> = 0x10000 -- the maximum number of bytes to read from the program's output at a time.
+        grace<float> = 0.5 -- the number of seconds to wait for the program to exit after SIGTERM before sending SIGKILL (0 kills immediately).
+        engine<str> = 'thread' -- monitor the program's output with a thread per pipe ('thread'), the shared multiplexer ('selector'), or the shared asyncio event loop ('asyncio').
+        coalesce_size<int> = 0x10000 -- merge consecutive output up to this many characters into a single update (0 disables merging).
+        coalesce_delay<float> = 0.0 -- the number of seconds to wait for more output to merge before updating.
+        queue_size<int> = 0x1000000 -- the maximum number of characters of output to queue before applying the overflow policy (0 is unbounded).
+        queue_overflow<str> = 'block' -- when the queue is full, block the program ('block'), discard the oldest output ('drop'), or write it to a temporary file ('spill').
         """
         ## default properties
         self.__updater__ = None
@@ -128,8 +843,10 @@ class process(object):
         self.command = command, args[:]
 
         self.eventWorking = Asynchronous.Event()
-        self.__taskQueue = Asynchronous.Queue()
+        self.__changed = Asynchronous.Event()
+        self.__taskQueue = outputqueue(kwds.get('queue_size', 0x1000000), kwds.get('queue_overflow', 'block'))
         self.__exceptionQueue = Asynchronous.Queue()
+        self.__inputQueue = None
 
         self.codec = codecs.lookup(kwds.get('encoding', 'iso8859-1' if sys.getdefaultencoding() == 'ascii' else sys.getdefaultencoding()))
         self.stdout = kwds.pop('stdout')
@@ -153,28 +870,105 @@ class process(object):
         cwd = kwds.get('cwd', os.getcwd())
         shell = kwds.get('shell', False)
         stdout, stderr = options.pop('stdout', self.stdout), options.pop('stderr', self.stderr)
+        blocksize, coalesce = kwds.get('blocksize', 0x10000), (kwds.get('coalesce_size', 0x10000), kwds.get('coalesce_delay', 0.0))
+        self.__grace = kwds.get('grace', 0.5)
+
+        ## create a new queue for the program's output in case its budget was changed
+        self.__taskQueue = outputqueue(kwds.get('queue_size', 0x1000000), kwds.get('queue_overflow', 'block'))
+
+        ## figure out which engine to monitor the program's i/o with
+        engine = kwds.get('engine', 'thread')
+        if engine not in {'thread', 'selector', 'asyncio'}:
+            raise ValueError("Unsupported engine ({!r}) was specified.".format(engine))
+        elif not {'selector': multiplexer, 'asyncio': eventloop}.get(engine, process).supported:
+            logger.warning("{:s}.start : Unable to use the \"{:s}\" engine within the current environment. Falling back to the \"{:s}\" engine.".format('.'.join((__name__, self.__class__.__name__)), engine, 'thread'))
+            engine = 'thread'
 
         ## spawn our subprocess using our new outputs
-        self.program = process.subprocess([self.command[0]] + self.command[1], cwd, env, joined=(stderr is None) or stdout == stderr, shell=shell, show=kwds.get('show', False))
+        if engine == 'asyncio':
+            loop = eventloop.default()
+            self.program = loop.subprocess([self.command[0]] + self.command[1], cwd, env, joined=(stderr is None) or stdout == stderr, shell=shell)
+        else:
+            loop = multiplexer.default() if engine == 'selector' else None
+            self.program = process.subprocess([self.command[0]] + self.command[1], cwd, env, joined=(stderr is None) or stdout == stderr, shell=shell, show=kwds.get('show', False))
         self.eventWorking.clear()
 
+        ## start the thread that writes to the program's stdin
+        self.__inputQueue = inputqueue(self.program.stdin, name="thread-{:x}.input".format(self.program.pid)).start()
+
         ## monitor program's i/o
-        self.__start_monitoring(stdout, stderr)
-        self.__start_updater(timeout=kwds.get('timeout', -1))
+        if loop:
+            self.__start_multiplexing(loop, stdout, stderr, blocksize=blocksize, coalesce=coalesce)
+        else:
+            self.__start_monitoring(stdout, stderr, blocksize=blocksize)
+            self.__start_updater(timeout=kwds.get('timeout', -1), coalesce=coalesce)
 
         ## start monitoring
         self.eventWorking.set()
+        hasattr(self.updater, 'notify') and self.updater.notify()
         return self
 
-    def __start_updater(self, daemon=True, timeout=0):
-        '''Start the updater thread. **used internally**'''
+    def __execute_task(self, emit, data):
+        '''Dispatch `data` to the callable or coroutine in `emit`. **used internally**'''
+        if hasattr(emit, 'send'):
+            res = emit.send(data)
+            res and self.write(res)
+        else: emit(data)
+
+    def __coalesce_tasks(self, emit, data, size, delay):
+        '''Merge any consecutive tasks for `emit` that arrive within `delay` seconds up to `size` characters. **used internally**'''
+        chunks, total, expiry = [data], len(data), time.time() + delay
+        while total < size:
+            remaining = expiry - time.time()
+            try:
+                res = self.taskQueue.get(block=True, timeout=remaining) if remaining > 0 else self.taskQueue.get(block=False)
+            except Asynchronous.QueueEmptyException:
+                break
+
+            # if we got a task for a different callable, then hand it back
+            # so that it can be processed afterwards. if it's our sentinel,
+            # then we give back an empty task so that the caller wakes up.
+            if res and res[0] is emit:
+                chunks.append(res[1])
+                total += len(res[1])
+            elif res:
+                return data[:0].join(chunks), res
+            else:
+                hasattr(self.taskQueue, 'task_done') and self.taskQueue.task_done()
+                return data[:0].join(chunks), ()
+            hasattr(self.taskQueue, 'task_done') and self.taskQueue.task_done()
+        return data[:0].join(chunks), None
+
+    def __drain(self, coalesce):
+        '''Process every task that is currently queued without blocking. **used internally**'''
+        size, _ = coalesce
+
+        pending = None
+        while self.eventWorking.is_set():
+            try:
+                res, pending = self.taskQueue.get(block=False) if pending is None else pending, None
+            except Asynchronous.QueueEmptyException:
+                break
+
+            if not res: continue
+            emit, data = res
+
+            try:
+                if size > 0:
+                    data, pending = self.__coalesce_tasks(emit, data, size, 0.0)
+                self.__execute_task(emit, data)
+            except StopIteration:
+                self.eventWorking.clear()
+            except:
+                self.exceptionQueue.put(sys.exc_info())
+                self.__changed.set()
+            finally:
+                hasattr(self.taskQueue, 'task_done') and self.taskQueue.task_done()
+            continue
+        return
 
-        ## define the closure that wraps our co-routines
-        def task_exec(emit, data):
-            if hasattr(emit, 'send'):
-                res = emit.send(data)
-                res and P.write(res)
-            else: emit(data)
+    def __start_updater(self, daemon=True, timeout=0, coalesce=(0x10000, 0.0)):
+        '''Start the updater thread. **used internally**'''
 
         ## define the closures that block on the specified timeout
         def task_get_timeout(P, timeout):
@@ -191,50 +985,117 @@ class process(object):
         task_get = task_get_timeout if timeout > 0 else task_get_notimeout
 
         ## define the closure that updates our queues and results
-        def update(P, timeout):
+        def update(P, timeout, coalesce):
+            size, delay = coalesce
             P.eventWorking.wait()
+
+            pending = None
             while P.eventWorking.is_set():
-                res = task_get(P, timeout)
+                res, pending = task_get(P, timeout) if pending is None else pending, None
                 if not res: continue
                 emit, data = res
 
                 try:
-                    task_exec(emit, data)
+                    if size > 0:
+                        data, pending = P.__coalesce_tasks(emit, data, size, delay)
+                    P.__execute_task(emit, data)
                 except StopIteration:
                     P.eventWorking.clear()
                 except:
                     P.exceptionQueue.put(sys.exc_info())
+                    P.__changed.set()
                 finally:
                     hasattr(P.taskQueue, 'task_done') and P.taskQueue.task_done()
                 continue
+
+            ## let anybody waiting on us know that we're done
+            P.__changed.set()
             return
 
         ## actually create and start our update threads
-        self.__updater__ = updater = Asynchronous.Thread(target=update, name="thread-{:x}.update".format(self.id), args=(self, timeout))
+        self.__updater__ = updater = Asynchronous.Thread(target=update, name="thread-{:x}.update".format(self.id), args=(self, timeout, coalesce))
         updater.daemon = daemon
         updater.start()
         return updater
 
-    def __make_reader(self, pipe, **parameters):
-        '''Return an iterator that decodes data from pipe using the current encoding.'''
+    def __start_multiplexing(self, loop, stdout, stderr=None, blocksize=0x10000, coalesce=(0x10000, 0.0)):
+        '''Start monitoring the program's pipes with the multiplexer or event loop in `loop`. **used internally**'''
+        name = "multiplexer-{:x}".format(self.program.pid)
+
+        ## attach a dispatcher to the loop that will process our work as it arrives
+        self.__updater__ = dispatcher = loop.dispatcher(functools.partial(self.__drain, coalesce), name="{:s}.update".format(name))
+
+        ## create the channels (coroutines) that will read from each pipe
+        params = dict(owner=dispatcher, blocksize=blocksize, decoder=functools.partial(self.codec.incrementaldecoder, errors='replace'), finished=self.__changed.set)
+        if stderr:
+            out_pair = stdout, self.program.stdout
+            err_pair = stderr, self.program.stderr
+            res = process.monitorMultiplexer(loop, self.taskQueue, out_pair, err_pair, name=name, **params)
+        else:
+            out_pair = stdout, self.program.stdout
+            res = process.monitorMultiplexer(loop, self.taskQueue, out_pair, name=name, **params)
+
+        ## attach a friendly method that allows injection of data into the monitor
+        res = list(res)
+        for t, q in res: t.send = q.send
+        channels, senders = zip(*res)
+
+        ## update our set of threads for destruction later
+        self.__threads__.update(channels)
+
+        ## set everything off
+        dispatcher.start()
+        for t in channels: t.start()
+
+    def __make_reader(self, pipe, blocksize=0x10000, **parameters):
+        '''Return an iterator that decodes blocks of up to `blocksize` bytes from pipe using the current encoding.'''
         decoder = self.codec.incrementaldecoder(**parameters)
 
-        # keep processing bytes and feeding them to our decoder. if the pipe
-        # is closed during this process, then that's ok and we can just leave.
-        bytereader = iter(functools.partial(pipe.read, 1), b'')
-        while not pipe.closed:
-            result = decoder.decode(next(bytereader))
+        # if the pipe lets us read directly into a buffer, then allocate a single
+        # one that we can reuse for every read. otherwise we fall back to using
+        # `pipe.read` which will allocate a new bytes object for each block.
+        if hasattr(pipe, 'readinto'):
+            buffer = bytearray(blocksize)
+            view = memoryview(buffer)
+            Fread = lambda: view[:pipe.readinto(buffer) or 0]
+        else:
+            Fread = functools.partial(pipe.read, blocksize)
+
+        # keep reading whatever is available from the pipe and feed it to our
+        # decoder. an unbuffered pipe returns as soon as any data is available,
+        # so partial blocks are yielded immediately. if the pipe is closed
+        # during this process, then that's ok and we can just leave.
+        try:
+            while not pipe.closed:
+                try:
+                    data = Fread()
+                except (OSError, ValueError):
+                    break
+
+                if not len(data):
+                    break
+
+                result = decoder.decode(data)
+                if result:
+                    yield result
+                continue
+
+            # flush anything that is still buffered within the decoder.
+            result = decoder.decode(b'', True)
             if result:
                 yield result
-            continue
+
+        # let anybody waiting on us know that this pipe is done.
+        finally:
+            self.__changed.set()
         return
 
-    def __start_monitoring(self, stdout, stderr=None):
+    def __start_monitoring(self, stdout, stderr=None, blocksize=0x10000):
         '''Start monitoring threads. **used internally**'''
         name = "thread-{:x}".format(self.program.pid)
 
         ## create monitoring threads (coroutines)
-        params = dict(errors='replace')
+        params = dict(blocksize=blocksize, errors='replace')
         if stderr:
             out_pair = stdout, self.__make_reader(self.program.stdout, **params)
             err_pair = stderr, self.__make_reader(self.program.stderr, **params)
@@ -324,10 +1185,34 @@ class process(object):
         return
 
     @staticmethod
-    def monitor(send, pipe, blocksize=1, daemon=True, name=None):
+    def monitorMultiplexer(loop, q, target, *more, **options):
+        """Register a coroutine with the multiplexer `loop` for stuffing queue `q` with data read from `target`.
+
+        The tuple `target` is composed of two values, `id` and `pipe`.
+
+        Yields a list of (channel, coro) tuples given the arguments provided.
+        Each channel will decode whatever is read from `pipe`, and stuff the result paired with `id` into `q`.
+        """
+        # the loop that reads from the pipe is also responsible for consuming the queue,
+        # so we can't block here. instead the loop backpressures the program by not
+        # reading from its pipes until all of the work has been processed.
+        def stuff(q, *key):
+            while True:
+                item = (yield),
+                q.put(key + item, False)
+            return
+
+        name = options.pop('name', '')
+        for id, pipe in itertools.chain([target], more):
+            res, description = stuff(q, id), "{:s}<{!r}>".format(name, id)
+            yield loop.channel(next(res) or res.send, pipe, name=description, **options), res
+        return
+
+    @staticmethod
+    def monitor(send, pipe, blocksize=0x10000, daemon=True, name=None):
         """Spawn a thread that reads `blocksize` bytes from `pipe` and dispatches it to `send`
 
-        For every single byte, `send` is called. The thread is named according to
+        For every block that is read, `send` is called. The thread is named according to
         the `name` parameter.
 
         Returns the monitoring Asynchronous.Thread instance
@@ -349,7 +1234,7 @@ class process(object):
                     # determine why (cause...y'know..python), stop dancing so
                     # the parent will actually be able to terminate us
                     break
-                [ send(item) for item in data ]
+                send(data)
             return
 
         ## create our shuffling thread
@@ -364,9 +1249,9 @@ class process(object):
 
     @staticmethod
     def monitor_reader(sender, reader, daemon=True, name=None):
-        """Spawn a thread that reads `blocksize` bytes from `pipe` and dispatches it to `send`
+        """Spawn a thread that consumes blocks from `reader` and dispatches them to `sender`
 
-        For every single byte, `send` is called. The thread is named according to
+        For every block that is produced, `sender` is called. The thread is named according to
         the `name` parameter.
 
         Returns the monitoring Asynchronous.Thread instance
@@ -374,7 +1259,7 @@ class process(object):
 
         def shuffle(sender, reader):
             for block in reader:
-                [ sender(item) for item in block ]
+                sender(block)
             return
 
         ## create our shuffling thread
@@ -394,18 +1279,24 @@ class process(object):
         return "Process {:d} {:s}".format(self.id, 'is still running' if res is None else "has terminated with code {:d}".format(res))
 
     def write(self, data):
-        '''Write `data` directly to program's stdin.'''
-        if self.running and not self.program.stdin.closed:
+        '''Queue `data` to be written to the program's stdin and return the number of bytes that were queued.'''
+        if self.running and self.inputQueue and not self.inputQueue.closed:
             if self.updater and self.updater.is_alive():
                 encoded, count = self.codec.encode(data)
-                return self.program.stdin.write(encoded)
+                return self.inputQueue.put(encoded)
             raise IOError("Unable to write to stdin for process {:d}. Updater thread has prematurely terminated.".format(self.id))
+        elif self.running and self.inputQueue and self.inputQueue.exception:
+            raise IOError("Unable to write to stdin for process {:d}. {!s}.".format(self.id, self.inputQueue.exception))
         raise IOError("Unable to write to stdin for process. {:s}.".format(self.__format_process_state()))
 
+    def drain(self, timeout=None):
+        '''Wait up to `timeout` seconds for everything written to the program to be sent to its stdin, and return whether it was.'''
+        return self.inputQueue.drain(timeout) if self.inputQueue else True
+
     def close(self):
-        '''Closes stdin of the program.'''
-        if self.running and not self.program.stdin.closed:
-            return self.program.stdin.close()
+        '''Closes stdin of the program once everything that was written has been sent.'''
+        if self.running and self.inputQueue and not self.inputQueue.closed:
+            return self.inputQueue.close()
         raise IOError("Unable to close stdin for process. {:s}.".format(self.__format_process_state()))
 
     def signal(self, signal):
@@ -421,6 +1312,46 @@ class process(object):
         hasattr(self.exceptionQueue, 'task_done') and self.exceptionQueue.task_done()
         return res
 
+    def __wait_for(self, predicate, timeout=None):
+        '''Block until `predicate` returns true or `timeout` seconds have elapsed, and return its result. **used internally**'''
+        expiry = None if timeout is None else time.time() + timeout
+        while True:
+            self.__changed.clear()
+            if predicate():
+                return True
+
+            remaining = None if expiry is None else expiry - time.time()
+            if remaining is not None and remaining <= 0:
+                return predicate()
+
+            # if nothing is left to notify us, then block on the program itself.
+            if not self.threads and not (self.updater and self.updater.is_alive()):
+                try: self.__wait_program(remaining)
+                except Asynchronous.TimeoutExpired: pass
+                continue
+
+            # otherwise we block until our monitors notify us. we use an
+            # interval so that we still notice the program terminating if
+            # its pipes were inherited by another process and never close.
+            self.__changed.wait(self.interval if remaining is None else min(remaining, self.interval))
+        return
+
+    def __wait_program(self, timeout=None):
+        '''Block until the program terminates, raising `Asynchronous.TimeoutExpired` if it has not after `timeout` seconds. **used internally**'''
+        if timeout is None:
+            return self.program.wait()
+
+        # if the program can't wait with a timeout (python2), then poll it.
+        elif not hasattr(Asynchronous.spawn_options, 'TimeoutExpired'):
+            expiry = time.time() + timeout
+            while self.program.poll() is None:
+                remaining = expiry - time.time()
+                if remaining <= 0:
+                    raise Asynchronous.TimeoutExpired(self.command[0], timeout)
+                time.sleep(min(remaining, self.interval))
+            return self.program.returncode
+        return self.program.wait(timeout)
+
     def wait(self, timeout=0.0):
         '''Wait a given amount of time for the process to terminate.'''
         if self.program is None:
@@ -432,26 +1363,17 @@ class process(object):
 
         self.updater.is_alive() and self.eventWorking.wait()
 
-        ## spin the cpu until we timeout
-        if timeout:
-            t = time.time()
-            while self.running and self.eventWorking.is_set() and time.time() - t < timeout:
-                if not self.exceptionQueue.empty():
-                    res = self.exception()
-                    reraise(res[0], res[1], res[2])
-                continue
-            return self.program.returncode if self.eventWorking.is_set() else self.__terminate()
-
-        ## return the program's result
+        ## block until the program terminates, we stop working, or an exception
+        ## is raised by one of the monitors. if we were given a timeout, then we
+        ## only block for that long before returning.
 
         # XXX: doesn't work correctly with PIPEs due to pythonic programmers' inability to understand os semantics
+        self.__wait_for(lambda: not self.running or not self.eventWorking.is_set() or not self.exceptionQueue.empty(), timeout or None)
+        if not self.exceptionQueue.empty():
+            res = self.exception()
+            reraise(res[0], res[1], res[2])
 
-        while self.running and self.eventWorking.is_set():
-            if not self.exceptionQueue.empty():
-                res = self.exception()
-                reraise(res[0], res[1], res[2])
-            continue    # ugh...poll-forever (and kill-cpu) until program terminates...
-
+        ## return the program's result
         if not self.eventWorking.is_set():
             return self.__terminate()
         return self.program.returncode
@@ -461,14 +1383,25 @@ class process(object):
         return self.__terminate()
 
     def __terminate(self):
-        '''Sends a SIGKILL signal and then waits for program to complete.'''
+        '''Sends a SIGTERM signal, waits for the grace period, and then sends a SIGKILL signal if the program has not completed.'''
         pid = self.program.pid
         try:
-            self.program.kill()
+            if self.running and self.__grace > 0:
+                self.program.terminate()
+                self.__wait_program(self.__grace)
+
+        except Asynchronous.TimeoutExpired:
+            logger.info("{:s}.__terminate : Process {:d} did not terminate within {:.2f} second{:s}. Killing it instead.".format('.'.join((__name__, self.__class__.__name__)), pid, self.__grace, '' if self.__grace == 1 else 's'))
+
+        except OSError as e:
+            logger.warning("{:s}.__terminate : Exception {!r} was raised while trying to terminate process {:d}.".format('.'.join((__name__, self.__class__.__name__)), e, pid), exc_info=True)
+
+        try:
+            self.running and self.program.kill()
         except OSError as e:
             logger.fatal("{:s}.__terminate : Exception {!r} was raised while trying to kill process {:d}. Terminating its management threads regardless.".format('.'.join((__name__, self.__class__.__name__)), e, pid), exc_info=True)
         finally:
-            while self.running: continue
+            self.program.wait()
 
         self.__stop_monitoring()
         if self.exceptionQueue.empty():
@@ -486,6 +1419,15 @@ class process(object):
         ## stop the update thread
         self.eventWorking.clear()
 
+        ## stop any multiplexed channels so that their pipes are no longer being read
+        [ th.cancel() for th in self.threads if hasattr(th, 'cancel') ]
+
+        ## release any monitors that are blocked waiting for room in the queue
+        hasattr(self.taskQueue, 'close') and self.taskQueue.close()
+
+        ## stop accepting input, anything still queued fails once the pipes are closed
+        self.inputQueue and self.inputQueue.close()
+
         ## forcefully close pipes that still open (this should terminate the monitor threads)
 
         # also, this fixes a resource leak since python doesn't do this on subprocess death
@@ -495,24 +1437,15 @@ class process(object):
                 except: pass
             continue
 
-        ## join all monitoring threads
-
-        # XXX: when cleaning up, this module disappears despite there still
-        #      being a reference for some reason
-        import operator
-
-        # XXX: there should be a better way to block until all threads have joined
-        [ th.join() for th in self.threads ]
-
-        # now spin until none of them are alive
-        while len(self.threads) > 0:
-            for th in self.threads[:]:
-                if not th.is_alive(): self.__threads__.discard(th)
-                del(th)
-            continue
+        ## join all monitoring threads, and then remove them
+        for th in self.threads:
+            th.join()
+            self.__threads__.discard(th)
+        self.inputQueue and self.inputQueue.join(self.interval)
 
         ## join the updater thread, and then remove it
         self.taskQueue.put(None)
+        hasattr(self.updater, 'cancel') and self.updater.cancel()
         self.updater.join()
         if self.updater.is_alive():
             raise AssertionError
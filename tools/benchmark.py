@@ -0,0 +1,639 @@
+"""
+This script benchmarks the startup of the plugin without an editor. The
+"vim" module is replaced with a stub that simulates just enough of the
+editor for the plugin to be loaded, set up, and used for the first time.
+The python code that is embedded in "autoload/incpy/internal.vim" is
+extracted from the script and executed as-is, so what gets measured is
+the same thing that runs when the editor starts.
+
+Each phase is timed and the number of calls to "vim.eval" and
+"vim.command" that it made are counted. The results are written as json
+so that they can be compared between commits to find regressions. Each
+phase also has a budget for the number of these round-trips it can make.
+
+The results also include a few checks for regressions that have been
+fixed before, such as the processor time used while waiting for a
+program to exit. The script exits with a non-zero status if any of the
+checks have failed.
+
+    $ python tools/benchmark.py --repeat 20 > startup.json
+"""
+import sys, os, re, io, json, types, argparse, itertools, functools, shutil, tempfile, textwrap, threading, time, timeit
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+### stand-in for the "vim" module
+class error(Exception):
+    """An exception raised by the stub for an expression or command that it does not understand."""
+
+class Dictionary(dict):
+    pass
+
+class List(list):
+    pass
+
+class Buffer(list):
+    """A buffer with its lines stored as a list."""
+
+    def __init__(self, number, name):
+        super(Buffer, self).__init__([''])
+        self.number, self.name = number, name
+        self.options, self.valid = {'modifiable': True}, True
+        self.vars = {'changedtick': 1}
+
+    def __setitem__(self, index, value):
+        self.vars['changedtick'] += 1
+        return super(Buffer, self).__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self.vars['changedtick'] += 1
+        return super(Buffer, self).__delitem__(index)
+
+    def __hash__(self):
+        return self.number
+
+    def __eq__(self, other):
+        return self is other
+
+    def append(self, lines, *index):
+        lines = [lines] if isinstance(lines, str) else lines
+        position = index[0] if index else len(self)
+        self[position:position] = lines
+
+class buffers(object):
+    """The buffer list, which is indexed by buffer number."""
+
+    def __init__(self, editor):
+        self.editor = editor
+
+    def __getitem__(self, number):
+        return self.editor.buffers[number]
+
+    def __iter__(self):
+        return iter([self.editor.buffers[number] for number in sorted(self.editor.buffers)])
+
+    def __len__(self):
+        return len(self.editor.buffers)
+
+class editor(object):
+    """
+    This class simulates the state of the editor that the plugin uses.
+    It evaluates the expressions and executes the commands that are used
+    while starting the plugin. Any expression or command that it doesn't
+    understand raises an exception so that the stub can be extended.
+    """
+
+    cwd, columns, lines = '/home/user', 160, 48
+    features = {'python3', 'timers', 'lambda'}
+
+    def __init__(self, variables):
+        self.counts = {'eval': 0, 'command': 0}
+        self.buffers, self.windows, self.tabs = {}, {}, []
+        self.identifiers, self.timers = itertools.count(1000), itertools.count(1)
+
+        # start with a single tab containing a window for an empty buffer.
+        self.buffers[1] = Buffer(1, '')
+        self.window = next(self.identifiers)
+        self.windows[self.window] = {'bufnr': 1, 'width': self.columns, 'height': self.lines - 2, 'type': ''}
+        self.tabs.append([self.window])
+        self.vars = Dictionary({name.encode('iso8859-1') : self.encode(value) for name, value in variables.items()})
+
+    # things that are exposed as the "vim" module
+    def module(self):
+        module = types.ModuleType('vim')
+        module.error, module.Dictionary, module.List, module.Buffer = error, Dictionary, List, Buffer
+        module.eval, module.command = self.eval, self.command
+        module.vars, module.buffers, module.tabpages = self.vars, buffers(self), []
+        module.current = types.SimpleNamespace(buffer=self.buffers[1])
+        return module
+
+    def eval(self, string):
+        self.counts['eval'] += 1
+        result = self.expression(string)
+        return result if isinstance(result, str) else self.render(result)
+
+    def command(self, string):
+        self.counts['command'] += 1
+        for pattern, method in self.commands:
+            match = re.match(pattern, string)
+            if match:
+                return method(self, *match.groups())
+            continue
+        raise error("Unsupported command: {:s}".format(string))
+
+    # conversion of values
+    @classmethod
+    def encode(cls, value):
+        '''Convert a python value into the types used by the "vim.vars" dictionary.'''
+        if isinstance(value, str):
+            return value.encode('iso8859-1')
+        elif isinstance(value, dict):
+            return Dictionary({name.encode('iso8859-1') : cls.encode(item) for name, item in value.items()})
+        elif isinstance(value, (list, tuple)):
+            return List(cls.encode(item) for item in value)
+        return value
+
+    @classmethod
+    def decode(cls, value):
+        '''Convert a value from the "vim.vars" dictionary into a python value.'''
+        if isinstance(value, bytes):
+            return value.decode('iso8859-1')
+        elif isinstance(value, dict):
+            return {cls.decode(name) : cls.decode(item) for name, item in value.items()}
+        elif isinstance(value, list):
+            return [cls.decode(item) for item in value]
+        return value
+
+    @classmethod
+    def render(cls, value):
+        '''Render a value the same way that "vim.eval" returns it, which is a string for anything that isn't a container.'''
+        if isinstance(value, dict):
+            return {name : cls.render(item) for name, item in value.items()}
+        elif isinstance(value, list):
+            return [cls.render(item) for item in value]
+        return "{!s}".format(value)
+
+    # layout of the editor
+    def tab(self, window):
+        iterable = (index for index, windows in enumerate(self.tabs) if window in windows)
+        return 1 + next(iterable, -1)
+
+    def current(self):
+        return self.tab(self.window)
+
+    def winnr(self, window):
+        windows = self.tabs[self.tab(window) - 1]
+        return 1 + windows.index(window)
+
+    def bufinfo(self, number):
+        buffer = self.buffers[number]
+        windows = [window for window, info in self.windows.items() if info['bufnr'] == number]
+        name = os.path.join(self.cwd, buffer.name) if buffer.name else ''
+        return {'bufnr': number, 'name': name, 'windows': windows, 'listed': 1, 'loaded': 1, 'hidden': 0 if windows else 1, 'changed': 0, 'linecount': len(buffer), 'variables': {}}
+
+    def wininfo(self, window):
+        info = self.windows[window]
+        return {'winid': window, 'tabnr': self.tab(window), 'winnr': self.winnr(window), 'bufnr': info['bufnr'], 'width': info['width'], 'height': info['height'], 'terminal': 0, 'quickfix': 0, 'loclist': 0, 'variables': {}}
+
+    def bufnumber(self, identity):
+        if isinstance(identity, int):
+            return identity if identity in self.buffers else -1
+        iterable = (number for number, buffer in self.buffers.items() if identity in {buffer.name, os.path.join(self.cwd, buffer.name)})
+        return next(iterable, -1)
+
+    # functions that can be called by an expression
+    functions = {
+        'has': lambda self, feature: int(feature in self.features),
+        'exists': lambda self, name: int(name[2:].encode('iso8859-1') in self.vars if name.startswith('g:') else 0),
+        'json_encode': lambda self, value: json.dumps(value),
+        'incpy#internal#encode': lambda self, value: json.dumps(value),
+        'function': lambda self, name, *args: name,
+        'map': lambda self, items, expression: [self.expression(expression, {'v:val': item}) for item in items],
+        'getbufinfo': lambda self, *identity: [self.bufinfo(number) for number in sorted(self.buffers) if not identity or number == self.bufnumber(*identity)],
+        'getwininfo': lambda self, *window: [self.wininfo(identifier) for identifier in itertools.chain(*self.tabs) if not window or identifier in window],
+        'gettabinfo': lambda self, *tab: [{'tabnr': 1 + index, 'windows': list(windows), 'variables': {}} for index, windows in enumerate(self.tabs) if not tab or 1 + index in tab],
+        'tabpagebuflist': lambda self, *tab: [self.windows[window]['bufnr'] for window in self.tabs[(tab[0] if tab else self.current()) - 1]],
+        'bufname': lambda self, *identity: self.buffers[self.bufnumber(*identity) if identity else self.windows[self.window]['bufnr']].name,
+        'bufnr': lambda self, *identity: self.bufnumber(*identity) if identity else self.windows[self.window]['bufnr'],
+        'bufexists': lambda self, identity: int(self.bufnumber(identity) > 0),
+        'bufadd': lambda self, name: self.bufnumber(name) if self.bufnumber(name) > 0 else self.badd(name),
+        'tabpagenr': lambda self, *last: len(self.tabs) if last else self.current(),
+        'win_getid': lambda self, *location: self.window if not location else self.tabs[(location[1] if len(location) > 1 else self.current()) - 1][location[0] - 1],
+        'win_gettype': lambda self, *window: self.windows[window[0] if window else self.window]['type'] if (window[0] if window else self.window) in self.windows else 'unknown',
+        'win_id2win': lambda self, window: self.winnr(window) if window in self.windows and self.tab(window) == self.current() else 0,
+        'win_id2tabwin': lambda self, window: [self.tab(window), self.winnr(window)] if window in self.windows else [0, 0],
+        'win_gotoid': lambda self, window: self.goto(window),
+        'win_findbuf': lambda self, number: [window for window, info in self.windows.items() if info['bufnr'] == number],
+        'winbufnr': lambda self, window: self.windows[window]['bufnr'] if window in self.windows else -1,
+        'timer_start': lambda self, *args: next(self.timers),
+        'timer_stop': lambda self, timer: 0,
+    }
+
+    options = {'columns': lambda self: self.columns, 'lines': lambda self: self.lines}
+
+    # evaluation of an expression
+    tokenizer = re.compile(r"""\s*(?:(?P<number>-?\d+(?:\.\d+)?)|(?P<single>'(?:[^']|'')*')|(?P<double>"(?:[^"\\]|\\.)*")|(?P<option>&\w+)|(?P<name>[A-Za-z_][\w:#]*)|(?P<symbol>[\[\](),.{}:]))""")
+
+    def tokens(self, string):
+        position, result = 0, []
+        while position < len(string.rstrip()):
+            match = self.tokenizer.match(string, position)
+            if not match:
+                raise error("Unable to parse expression at {:d}: {:s}".format(position, string))
+            kind = match.lastgroup
+            result.append((kind, match.group(kind)))
+            position = match.end()
+        return result
+
+    def expression(self, string, scope={}):
+        tokens = self.tokens(string)
+        value, position = self.parse(tokens, 0, scope)
+        if position != len(tokens):
+            raise error("Unsupported expression: {:s}".format(string))
+        return value
+
+    def parse(self, tokens, position, scope):
+        kind, token = tokens[position]
+        position += 1
+
+        if kind == 'number':
+            value = float(token) if '.' in token else int(token)
+        elif kind == 'single':
+            value = token[1:-1].replace("''", "'")
+        elif kind == 'double':
+            value = json.loads(token)
+        elif kind == 'option' and token[1:] in self.options:
+            value = self.options[token[1:]](self)
+        elif kind == 'symbol' and token == '[':
+            value = []
+            while tokens[position] != ('symbol', ']'):
+                item, position = self.parse(tokens, position, scope)
+                value.append(item)
+                position += 1 if tokens[position] == ('symbol', ',') else 0
+            position += 1
+        elif kind == 'symbol' and token == '{':
+            value = {}
+            while tokens[position] != ('symbol', '}'):
+                key, position = self.parse(tokens, position, scope)
+                value[key], position = self.parse(tokens, position + 1, scope)
+                position += 1 if tokens[position] == ('symbol', ',') else 0
+            position += 1
+        elif kind == 'name' and position < len(tokens) and tokens[position] == ('symbol', '('):
+            if token not in self.functions:
+                raise error("Unsupported function: {:s}".format(token))
+            arguments, position = [], position + 1
+            while tokens[position] != ('symbol', ')'):
+                item, position = self.parse(tokens, position, scope)
+                arguments.append(item)
+                position += 1 if tokens[position] == ('symbol', ',') else 0
+            value, position = self.functions[token](self, *arguments), position + 1
+        elif kind == 'name' and token in scope:
+            value = scope[token]
+        elif kind == 'name' and token.startswith('g:') and token[2:].encode('iso8859-1') in self.vars:
+            value = self.decode(self.vars[token[2:].encode('iso8859-1')])
+        elif kind == 'name' and token in {'v:true', 'v:false'}:
+            value = token == 'v:true'
+        else:
+            raise error("Unsupported token: {:s}".format(token))
+
+        # handle any member access that follows the value.
+        while position + 1 < len(tokens) and tokens[position] == ('symbol', '.') and tokens[position + 1][0] == 'name':
+            value, position = value[tokens[position + 1][1]], position + 2
+        return value, position
+
+    # commands that modify the layout
+    def badd(self, name):
+        number = 1 + max(self.buffers)
+        self.buffers[number] = Buffer(number, name)
+        return number
+
+    def goto(self, window):
+        if window not in self.windows:
+            return 0
+        self.window = window
+        return 1
+
+    def split(self, tabdo, location, size, split, number, preview=False):
+        tab = int(tabdo) if tabdo else self.current()
+        windows = self.tabs[tab - 1]
+        index = windows.index(self.window) if self.window in windows else 0
+        window = next(self.identifiers)
+        width, height = (int(size or self.columns // 2), self.lines - 2) if split == 'vsplit' else (self.columns, int(size or self.lines // 2))
+        self.windows[window] = {'bufnr': int(number), 'width': width, 'height': height, 'type': 'preview' if preview else ''}
+        windows.insert(index if location == 'leftabove' else index + 1, window)
+        self.window = window
+
+    def windo(self, tabdo, number, command):
+        tab = int(tabdo) if tabdo else self.current()
+        window = self.tabs[tab - 1][int(number) - 1]
+        if command.startswith('close') or command.startswith('pclose'):
+            self.tabs[tab - 1].remove(window)
+            self.windows.pop(window)
+            self.window = self.window if self.window in self.windows else self.tabs[tab - 1][0]
+            return
+        self.window = window
+
+    def let(self, name, value):
+        self.vars[name.encode('iso8859-1')] = self.encode(self.expression(value))
+
+    def unlet(self, name):
+        self.vars.pop(name.encode('iso8859-1'), None)
+
+    commands = [
+        (r"silent! badd (.+)$", lambda self, name: self.badd(name)),
+        (r"noautocmd silent (?:(\d+)tabdo )?(leftabove|rightbelow) (\d+)(split|vsplit)! (?:\+(?:\\ |\S)+ )?#(\d+)$", split),
+        (r"noautocmd silent (?:(\d+)tabdo )?(leftabove|rightbelow) pedit! (?:\+(?:\\ |\S)+ )?#(\d+)$", lambda self, tabdo, location, number: self.split(tabdo, location, 0, 'split', number, preview=True)),
+        (r"noautocmd silent! (?:\d+tabdo )?wincmd P$", lambda self: None),
+        (r"noautocmd silent (?:(\d+)tabdo )?(\d+)windo (p?close)!$", windo),
+        (r"(?:(\d+)tabdo )?(\d+)windo (setlocal .*)$", windo),
+        (r"buffer (\d+)$", lambda self, number: self.windows[self.window].__setitem__('bufnr', int(number))),
+        (r"let g:(\S+) = (.+)$", let),
+        (r"unlet! g:(\S+)$", unlet),
+    ]
+
+### extracting the plugin's code from its vim scripts
+def heredoc(path, name):
+    '''Return the lines of the heredoc assigned to the variable `name` in the vim script at `path`.'''
+    with io.open(path, 'rt', encoding='utf-8') as infile:
+        script = infile.read()
+    match = re.search(r"let {:s} =<< trim (\w+)\n(.*?)\n\s*\1\n".format(re.escape(name)), script, re.DOTALL)
+    if not match:
+        raise error("Unable to find the heredoc for \"{:s}\" in {:s}".format(name, path))
+    return textwrap.dedent(match.group(2))
+
+def variables(program, cache):
+    '''Return the global variables that are assigned by "incpy#options#setup" that are needed to start the plugin.'''
+    return {
+        'incpy#PackageName': '__incpy__', 'incpy#PluginName': 'incpy', 'incpy#BytecodeCache': cache,
+        'incpy#Program': program, 'incpy#ProgramOptions': {}, 'incpy#Terminal': 0, 'incpy#Greenlets': 0,
+        'incpy#Echo': 1, 'incpy#EvalSingle': 0, 'incpy#EchoFormat': '# >>> {}', 'incpy#EchoNewline': '{}\n', 'incpy#ExecFormat': '{}\n',
+        'incpy#OutputFollow': 1, 'incpy#OutputRate': 30, 'incpy#ScrollbackLines': 0, 'incpy#ScrollbackBytes': 0,
+        'incpy#WindowName': 'Scratch', 'incpy#WindowRatio': 1.0 / 3, 'incpy#WindowPosition': 'below',
+        'incpy#WindowOptions': {}, 'incpy#WindowPreview': 0, 'incpy#WindowFixed': 0, 'incpy#WindowStartup': 1,
+        'incpy#InternalThread': 0, 'incpy#InternalTimeout': 0,
+        'incpy#CoreWindowOptions': {'buftype': 'nofile', 'swapfile': False, 'updatecount': 0, 'buflisted': False, 'bufhidden': 'hide'},
+    }
+
+### phases of the startup
+class startup(object):
+    """
+    This class runs each phase of starting the plugin against a new stub
+    of the editor. The phases are executed in the same order as the editor
+    does when it loads the plugin, and the first use of the interpreter is
+    the same as the ":Py" command which shows the window and executes code.
+    """
+
+    package = '__incpy__'
+
+    def __init__(self, program='', cache=''):
+        self.editor = editor(variables(program, cache))
+        self.phases = []
+
+        # extract the code from the script before anything is measured.
+        internal = os.path.join(root, 'autoload', 'incpy', 'internal.vim')
+        self.code = {name : heredoc(internal, name) for name in ['unnamed_definition', 'install_interpreter', 'create_view']}
+
+    def measure(self, name, callable, *args):
+        counts, started = dict(self.editor.counts), time.perf_counter()
+        result = callable(*args)
+        elapsed = time.perf_counter() - started
+        self.phases.append((name, elapsed, {kind : self.editor.counts[kind] - counts[kind] for kind in counts}))
+        return result
+
+    def __enter__(self):
+        self.state, self.meta_path = (sys.stdin, sys.stdout, sys.stderr), sys.meta_path[:]
+        sys.modules['vim'] = self.editor.module()
+        return self
+
+    def __exit__(self, *exception):
+        package = sys.modules.get(self.package)
+        cache = getattr(package, 'cache', None)
+        try:
+            cache is not None and cache.started and cache.stop()
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = self.state
+            sys.meta_path[:] = self.meta_path
+            [sys.modules.pop(name) for name in list(sys.modules) if name == 'vim' or name.split('.', 1)[0] == self.package]
+
+    # incpy#internal#load
+    def load(self):
+        closure = self.code['unnamed_definition'] % 'generate_package_loaders'
+        namespace = {}
+        exec(closure, namespace, namespace)
+        vars = self.editor.vars
+        parameters = [self.package, os.path.join(root, 'python', ''), 'incpy', vars[b'incpy#BytecodeCache'].decode('iso8859-1')]
+        sys.meta_path.extend(namespace['generate_package_loaders'](*parameters))
+
+    # the imports that happen at the beginning of incpy#internal#setup
+    def imports(self):
+        package = __import__(self.package)
+        for module in ['workspace', 'interface', 'interpreters']:
+            __import__('.'.join([self.package, module]))
+        return package
+
+    # incpy#internal#workspace
+    def workspace(self, name):
+        package = sys.modules[self.package]
+        workspace = __import__('.'.join([self.package, 'workspace'])).workspace
+        code = self.code[name].replace('%s', "'{:s}'".format(self.package), 1)
+        package.exec_(code, workspace.__dict__, workspace.__dict__)
+
+    # incpy#internal#dispatch
+    def dispatch(self, method, *parameters, **keywords):
+        package, name = sys.modules[self.package], 'incpy#internal#payload'
+        self.editor.vars[name.encode('iso8859-1')] = self.editor.encode([[method], list(parameters), keywords, True])
+        try:
+            return package.dispatch()
+        finally:
+            self.editor.vars.pop(name.encode('iso8859-1'), None)
+
+    # incpy#interpreter#execute
+    def execute(self, code):
+        vars, decode = self.editor.vars, self.editor.decode
+        position, ratio = (decode(vars[name]) for name in [b'incpy#WindowPosition', b'incpy#WindowRatio'])
+        self.dispatch('show', position, ratio, **decode(vars[b'incpy#CoreWindowOptions']))
+        package = sys.modules[self.package]
+        return package.cache.communicate(decode(vars[b'incpy#ExecFormat']).format(code))
+
+    def run(self):
+        self.measure('load', self.load)
+        self.measure('import', self.imports)
+        self.measure('setup', self.workspace, 'install_interpreter')
+        self.measure('setup_view', self.workspace, 'create_view')
+        self.measure('first_use', self.execute, 'pass')
+        self.measure('second_use', self.execute, 'pass')
+        return self.phases
+
+def summarize(runs):
+    '''Combine the phases from each run into a dictionary containing the median and minimum time along with the number of calls.'''
+    result = {}
+    for name, _, counts in runs[0]:
+        times = sorted(elapsed for phases in runs for phase, elapsed, _ in phases if phase == name)
+        result[name] = {'median': times[len(times) // 2], 'minimum': times[0]}
+        result[name].update(counts)
+    return result
+
+def benchmark_startup(repeat, program):
+    '''Run the phases for starting the plugin with each state of the bytecode cache.'''
+    directory = tempfile.mkdtemp(prefix='incpy-benchmark-')
+    try:
+        # do an untimed run first so that the warm cache is populated, and so
+        # that the modules imported by the plugin are already cached by python.
+        with startup(program, os.path.join(directory, 'warm')) as instance:
+            instance.run()
+
+        result = {}
+        for variant in ['source', 'cold', 'warm']:
+            runs = []
+            for index in range(repeat):
+                cache = '' if variant == 'source' else os.path.join(directory, "{:s}-{:d}".format(variant, index) if variant == 'cold' else variant)
+                with startup(program, cache) as instance:
+                    runs.append(instance.run())
+                continue
+            result[variant] = summarize(runs)
+        return result
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+### marshalling of values
+def best(callable, number, repeat=5):
+    return min(timeit.repeat(callable, number=number, repeat=repeat)) / number
+
+def benchmark_marshal():
+    '''Compare decoding a result that was serialized as json with guessing the types of a result that was rendered as strings.'''
+    buffers = [{'bufnr': index, 'changed': 0, 'changedtick': 3, 'hidden': 0, 'lastused': 1700000000, 'listed': 1, 'lnum': 1, 'linecount': 120, 'loaded': 1, 'name': "/home/user/project/module{:d}.py".format(index), 'signs': [], 'variables': {'changedtick': 3}, 'windows': [1000 + index] if index % 10 == 0 else []} for index in range(300)]
+    windows = [{'botline': 40, 'bufnr': index, 'height': 40, 'loclist': 0, 'quickfix': 0, 'terminal': 0, 'tabnr': 1 + index // 4, 'topline': 1, 'variables': {}, 'width': 80, 'winbar': 0, 'wincol': 1, 'winid': 1000 + index, 'winnr': 1 + index % 4, 'winrow': 2, 'textoff': 0} for index in range(40)]
+
+    result = {}
+    with startup() as instance:
+        instance.load()
+        vim = instance.imports().interface.vim
+        for name, payload in [('getbufinfo', buffers), ('getwininfo', windows)]:
+            encoded, rendered = json.dumps(payload), editor.render(payload)
+            json_time = best(functools.partial(vim._from, encoded), 200)
+            strings_time = best(functools.partial(vim._from_strings, rendered), 200)
+            result[name] = {'count': len(payload), 'json': json_time, 'strings': strings_time}
+        return result
+
+def benchmark_gvars():
+    '''Measure reading global variables through the wrapper used by "vim.gvars".'''
+    with startup() as instance:
+        instance.editor.vars[b'incpy#Nested'] = editor.encode({'items': [{'key': ['a', 'b', 'c']} for index in range(10)]})
+        instance.load()
+        gvars = instance.imports().interface.vim.gvars
+        names = ['incpy#Program', 'incpy#Echo', 'incpy#EchoFormat', 'incpy#EchoNewline', 'incpy#OutputFollow', 'incpy#WindowName']
+        scalar = lambda: [gvars[name] for name in names]
+        nested = lambda: [gvars['incpy#Nested']['items'][index]['key'][2] for index in range(10)]
+        return {'scalar': best(scalar, 20000) / len(names), 'nested': best(nested, 2000) / 10}
+
+def benchmark_write(count):
+    '''Measure writing `count` small pieces of output to a buffer through the "buffer" class that is used by the output window.'''
+    with startup() as instance:
+        instance.load()
+        interface = instance.imports().interface
+        buffer = interface.buffer(instance.editor.badd('Scratch'))
+        pieces = ["line {:d}\n".format(index) if index % 4 else "partial {:d} ".format(index) for index in range(count)]
+
+        counts, started = dict(instance.editor.counts), time.perf_counter()
+        [buffer.write(piece) for piece in pieces]
+        elapsed = time.perf_counter() - started
+        result = {'writes': count, 'lines': len(buffer.buffer), 'elapsed': elapsed, 'each': elapsed / count}
+        result.update({kind : instance.editor.counts[kind] - counts[kind] for kind in counts})
+        return result
+
+### monitoring of processes
+engines = ['thread', 'selector', 'asyncio']
+
+def benchmark_wait(seconds=1.0):
+    '''Measure the processor time that is used while blocking on "process.wait" for a program that sleeps without writing anything.'''
+    result = {}
+    with startup() as instance:
+        instance.load()
+        instance.imports()
+        process = sys.modules['.'.join([instance.package, 'process'])]
+        for engine in engines:
+            program = process.spawn(lambda data: None, ['sleep', "{:g}".format(seconds)], engine=engine)
+            started, used = time.perf_counter(), time.process_time()
+            program.wait()
+            elapsed, used = time.perf_counter() - started, time.process_time() - used
+            result[engine] = {'elapsed': elapsed, 'cpu': used, 'ratio': used / elapsed}
+        return result
+
+def deliver(process, size, timeout=120.0, **options):
+    '''Return how long it takes for `size` bytes written by a program to be delivered to its callable when it is spawned with `options`.'''
+    code = "import sys\nblock = b'x' * 1023 + b'\\n'\nfor index in range({:d}): sys.stdout.buffer.write(block)".format(size // 1024)
+    received, finished = [0, 0], threading.Event()
+    def update(data):
+        received[0], received[1] = received[0] + len(data), received[1] + 1
+        received[0] < size or finished.set()
+
+    # the program can exit before its output is delivered, so we wait for all of it.
+    started, used = time.perf_counter(), time.process_time()
+    program = process.spawn(update, [sys.executable, '-c', code], **options)
+    finished.wait(timeout)
+    elapsed, used = time.perf_counter() - started, time.process_time() - used
+    program.wait()
+
+    count, updates = received
+    return {'size': size, 'bytes': count, 'updates': updates, 'elapsed': elapsed, 'cpu': used, 'rate': count / elapsed}
+
+def benchmark_throughput(size, baseline=0x40000):
+    '''Measure the time it takes for each engine to deliver `size` bytes written by a program, and compare it to reading a byte at a time.'''
+    with startup() as instance:
+        instance.load()
+        instance.imports()
+        process = sys.modules['.'.join([instance.package, 'process'])]
+        result = {'engines': {engine : deliver(process, size, engine=engine) for engine in engines}}
+
+        # reading a single byte at a time is how the output used to be read. this is
+        # really slow, so we only read a fraction of the size for it to compare with.
+        result['baseline'] = deliver(process, min(size, baseline), engine='thread', blocksize=1)
+        result['speedup'] = result['engines']['thread']['rate'] / result['baseline']['rate']
+        return result
+
+### checks for regressions
+# the most round-trips (evaluations and commands) that each phase of the startup
+# is allowed to make when using the internal interpreter or an external program.
+budget = {
+    'internal': {'load': 0, 'import': 1, 'setup': 0, 'setup_view': 0, 'first_use': 15, 'second_use': 2},
+    'external': {'load': 0, 'import': 1, 'setup': 0, 'setup_view': 0, 'first_use': 17, 'second_use': 2},
+}
+
+def check_roundtrips(result, program):
+    '''Fail if any phase of the startup made more round-trips to the editor than its budget allows.'''
+    phases = budget['external' if program else 'internal']
+    exceeded = sorted('.'.join([variant, name]) for variant, items in result.items() for name, item in items.items() if item['eval'] + item['command'] > phases.get(name, 0))
+    return {'budget': phases, 'exceeded': exceeded, 'passed': not exceeded}
+
+def check_write(result, limit=0):
+    '''Fail if writing to the output buffer made more than `limit` round-trips to the editor for each write.'''
+    return {'limit': limit, 'passed': result['eval'] + result['command'] <= limit * result['writes']}
+
+def check_wait(result, limit=0.05):
+    '''Fail if blocking on a program used more than `limit` of a processor for any engine.'''
+    return {'limit': limit, 'passed': all(item['ratio'] <= limit for item in result.values())}
+
+def check_throughput(result):
+    '''Fail if any engine or the baseline lost some of the bytes that were written by the program.'''
+    items = list(result['engines'].values()) + [result['baseline']]
+    return {'passed': all(item['bytes'] == item['size'] for item in items)}
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description='Benchmark the startup of the plugin using a stub in place of the editor.')
+    parser.add_argument('-r', '--repeat', type=int, default=10, help='the number of times to run each phase (default: %(default)s)')
+    parser.add_argument('-p', '--program', default='', help='the external program to use as the interpreter (default: internal)')
+    parser.add_argument('-w', '--writes', type=int, default=10000, help='the number of small writes to make to the output buffer (default: %(default)s)')
+    parser.add_argument('-s', '--size', type=int, default=16, help='the number of megabytes of output to read from a program with each engine (default: %(default)s)')
+    parser.add_argument('-o', '--output', default='-', help='the file to write the json results to (default: stdout)')
+    parser.add_argument('--indent', type=int, default=None, help='the indentation to use for the json results')
+    options = parser.parse_args(arguments)
+
+    result = {
+        'python': '.'.join(map("{!s}".format, sys.version_info[:3])),
+        'platform': sys.platform,
+        'repeat': options.repeat,
+        'program': options.program,
+        'startup': benchmark_startup(max(1, options.repeat), options.program),
+        'marshal': benchmark_marshal(),
+        'gvars': benchmark_gvars(),
+        'write': benchmark_write(max(1, options.writes)),
+        'wait': benchmark_wait(),
+        'throughput': benchmark_throughput(max(1, options.size) * 0x100000),
+    }
+    result['checks'] = {
+        'roundtrips': check_roundtrips(result['startup'], options.program),
+        'write': check_write(result['write']),
+        'wait': check_wait(result['wait']),
+        'throughput': check_throughput(result['throughput']),
+    }
+
+    output = sys.stdout if options.output == '-' else io.open(options.output, 'wt')
+    try:
+        json.dump(result, output, indent=options.indent, sort_keys=True)
+        output.write(u'\n')
+    finally:
+        output is sys.stdout or output.close()
+    return 0 if all(check['passed'] for check in result['checks'].values()) else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,39 @@
+" This script measures the cost of passing code from vim to the interpreter
+" without the python interface. It compares the encoding that was previously
+" done by "incpy#internal#communicate", which escaped every character with
+" substitute() so that the code could be embedded as a string literal in a
+" pythonx command, with storing the code unescaped in a global variable that
+" is read with vim.eval. Only the vim side is timed since python reads both.
+"
+"     $ vim -Nu NONE -es -S tools/transport.vim 2>&1
+"
+" The results are written to stderr with a line for each number of lines.
+
+let s:line = "    result = [item * 2 for item in range(10) if item % 3]  # comment"
+let s:counts = [10, 100, 1000, 5000]
+
+function! s:escape(code)
+    return substitute(a:code, '.', '\=printf("\\x%02x", char2nr(submatch(0)))', 'g')
+endfunction
+
+function! s:assign(code)
+    let g:incpy#internal#payload = ['{}', a:code]
+    unlet! g:incpy#internal#payload
+endfunction
+
+verbose echon printf("%8s %12s %12s\n", 'lines', 'substitute', 'variable')
+for s:count in s:counts
+    let s:code = join(repeat([s:line], s:count), "\n")
+
+    let s:started = reltime()
+    call s:escape(s:code)
+    let s:escaped = reltimefloat(reltime(s:started))
+
+    let s:started = reltime()
+    call s:assign(s:code)
+    let s:assigned = reltimefloat(reltime(s:started))
+
+    verbose echon printf("%8d %11.4fs %11.6fs\n", s:count, s:escaped, s:assigned)
+endfor
+
+qa!